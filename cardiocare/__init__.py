@@ -0,0 +1 @@
+"""CardioCare building blocks shared by the Streamlit app and offline tooling."""
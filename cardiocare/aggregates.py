@@ -0,0 +1,74 @@
+"""
+Running counts behind the Health Dashboard.
+
+``RiskAggregates`` keeps the number of patients, how many have each
+dashboard risk factor and how many fall in each probability band. Adding
+a prediction touches a fixed number of counters, so the dashboard never
+rescans the history: HistoryStore folds each written batch into counters
+stored next to the log, and the dataset baseline is counted once.
+"""
+
+from collections import Counter
+
+import numpy as np
+
+from cardiocare.health import (RISK_BANDS, RISK_FACTORS, calculate_bmi, get_risk_band,
+                               get_risk_factors, risk_factor_matrix)
+
+
+class RiskAggregates:
+    """Patient, risk factor and risk band counts"""
+
+    def __init__(self, total=0, factors=None, bands=None):
+        self.total = total
+        self.factors = Counter(factors or {})
+        self.bands = Counter(bands or {})
+
+    def add(self, record, probability=None):
+        """Count one form record (and its predicted probability, if any)"""
+        self.total += 1
+        self.factors.update(get_risk_factors(record, calculate_bmi(record['height'], record['weight'])))
+        if probability is not None:
+            self.bands[get_risk_band(probability)] += 1
+
+    def update(self, other):
+        self.total += other.total
+        self.factors.update(other.factors)
+        self.bands.update(other.bands)
+
+    def prevalence(self):
+        """Percentage of patients with each risk factor, in RISK_FACTORS order"""
+        return [100 * self.factors[name] / self.total if self.total else 0.0 for name in RISK_FACTORS]
+
+    def band_counts(self):
+        return [self.bands[band] for band in RISK_BANDS]
+
+    def to_counts(self):
+        """Flat {key: count} form stored by the history database"""
+        counts = {'total': self.total}
+        counts.update({f"factor:{name}": n for name, n in self.factors.items()})
+        counts.update({f"band:{band}": n for band, n in self.bands.items()})
+        return counts
+
+    @classmethod
+    def from_counts(cls, counts):
+        aggregates = cls(counts.get('total', 0))
+        for key, n in counts.items():
+            kind, _, name = key.partition(":")
+            if kind == "factor":
+                aggregates.factors[name] = n
+            elif kind == "band":
+                aggregates.bands[name] = n
+        return aggregates
+
+
+def dataset_aggregates(data_dir=None):
+    """Risk factor counts over cardio_preprocessed.csv (no probabilities)"""
+    from cardiocare.dataset import DATA_DIR, load_frame
+    from cardiocare.training import MAPPINGS
+
+    df = load_frame("cardio_preprocessed", data_dir or DATA_DIR)
+    features = {col: df[col].to_numpy() for col in ['ap_hi', 'ap_lo', 'cholesterol', 'smoke', 'gluc', 'active']}
+    bmi = calculate_bmi(df['height'].to_numpy(dtype=np.float64), df['weight'].to_numpy(dtype=np.float64))
+    flags = risk_factor_matrix(features, bmi, MAPPINGS)
+    return RiskAggregates(len(df), dict(zip(RISK_FACTORS, map(int, flags.sum(axis=0)))))
@@ -0,0 +1,285 @@
+"""
+Pickle-free model artifact.
+
+``models/artifact/`` holds the model as plain data: ``manifest.json`` (format
+version, model version, classes, feature columns, label mappings, scaler
+columns and, per array, its dtype, shape and SHA-256) next to one ``.npy``
+file per array: the flattened forest nodes (see cardiocare.forest), the
+scaler's mean/scale and, once fitted, the probability calibration's lookup
+knots (see cardiocare.calibration). Loading memory-maps the arrays, so
+nothing is executed, no sklearn is imported and forked workers share the
+pages; every batch is scored by the flat NumPy walk (see cardiocare.forest).
+
+``load_models()`` uses it whenever it was converted from the pickles now
+in models/ (or they are gone): the manifest records each pickle's SHA-256,
+rehashed only when its size or mtime changed (e.g. after a checkout).
+Training writes it next to them, and existing pickles are converted with
+
+    python -m cardiocare.artifact            # convert models/*.pkl
+    python -m cardiocare.artifact --check    # validate (with checksums) and time a load
+
+The array checksums are checked by ``--check`` and, at every load, when
+CARDIOCARE_ARTIFACT_VERIFY=1. Set CARDIOCARE_ARTIFACT=0 to always load
+the pickles.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from cardiocare.forest import FlatForest
+from cardiocare.models import MODEL_FILES, MODELS_DIR, file_sha256
+
+FORMAT = "cardiocare-model"
+FORMAT_VERSION = 1
+ARTIFACT_DIR = "artifact"
+MANIFEST = "manifest.json"
+
+# Every array of the format: name -> (dtype, ndim)
+SCHEMA = {
+    'forest.feature': ('<i4', 1),
+    'forest.threshold': ('<f8', 1),
+    'forest.children': ('<i4', 1),
+    'forest.is_leaf': ('|b1', 1),
+    'forest.value': ('<f8', 2),
+    'forest.roots': ('<i4', 1),
+    'forest.feature_importances': ('<f8', 1),
+    'scaler.mean': ('<f8', 1),
+    'scaler.scale': ('<f8', 1),
+}
+# Optional arrays, present when the manifest has a ``calibration`` entry
+CALIBRATION_SCHEMA = {
+    'calibration.x': ('<f8', 1),
+    'calibration.y': ('<f8', 1),
+}
+
+ENABLED = os.environ.get("CARDIOCARE_ARTIFACT", "1") != "0"
+VERIFY = os.environ.get("CARDIOCARE_ARTIFACT_VERIFY", "0") == "1"
+
+# (path, size, mtime_ns) -> SHA-256 of pickles hashed by this process
+_source_hashes = {}
+
+
+class ScalerStats:
+    """A fitted StandardScaler's statistics: all FeatureEncoder needs of scaler.pkl"""
+
+    def __init__(self, columns, mean, scale):
+        self.feature_names_in_ = np.asarray(columns, dtype=object)
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+def artifact_dir(models_dir=MODELS_DIR):
+    return os.path.join(models_dir, ARTIFACT_DIR)
+
+
+def _source(path):
+    """Size, mtime and SHA-256 of a pickle, hashed once per process while it is unchanged"""
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _source_hashes:
+        _source_hashes[key] = file_sha256(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': _source_hashes[key]}
+
+
+def is_current(models_dir=MODELS_DIR):
+    """True when the artifact was converted from the pickles now in ``models_dir``, or they are gone"""
+    try:
+        sources = read_manifest(models_dir).get('sources', {})
+    except (OSError, ValueError):
+        return False
+    for name in MODEL_FILES:
+        path = os.path.join(models_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        recorded = sources.get(name)
+        if recorded is None:
+            return False
+        # File times follow checkout order, so only a hash tells a changed pickle apart
+        if ((stat.st_size, stat.st_mtime_ns) != (recorded['size'], recorded['mtime_ns'])
+                and _source(path)['sha256'] != recorded['sha256']):
+            return False
+    return True
+
+
+def read_manifest(models_dir=MODELS_DIR):
+    with open(os.path.join(artifact_dir(models_dir), MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT or manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"{ARTIFACT_DIR}/{MANIFEST} has an unsupported format; convert the pickles again")
+    return manifest
+
+
+def _check_schema(arrays, schema):
+    missing = set(schema) - set(arrays)
+    if missing:
+        raise ValueError(f"Model artifact is missing arrays: {', '.join(sorted(missing))}")
+    for name, (dtype, ndim) in schema.items():
+        array = arrays[name]
+        if array.dtype.str != dtype or array.ndim != ndim:
+            raise ValueError(f"Model artifact array {name} is {array.dtype.str}/{array.ndim}d, expected {dtype}/{ndim}d")
+
+
+def _validate(manifest, arrays):
+    """Schema and cross-array checks, so a bad artifact fails on load rather than mid-walk"""
+    _check_schema(arrays, SCHEMA)
+    model = manifest['model']
+    n_nodes = len(arrays['forest.feature'])
+    n_features = model['n_features']
+    if (len(arrays['forest.threshold']) != n_nodes or len(arrays['forest.is_leaf']) != n_nodes
+            or len(arrays['forest.children']) != 2 * n_nodes
+            or arrays['forest.value'].shape != (n_nodes, len(model['classes']))
+            or len(arrays['forest.roots']) != model['n_estimators']
+            or len(arrays['forest.feature_importances']) != n_features
+            or len(manifest['feature_columns']) != n_features):
+        raise ValueError("Model artifact arrays don't match the manifest's shapes")
+    for name, upper in (('forest.feature', n_features), ('forest.children', n_nodes), ('forest.roots', n_nodes)):
+        array = arrays[name]
+        if len(array) and (array.min() < 0 or array.max() >= upper):
+            raise ValueError(f"Model artifact array {name} has out-of-range indices")
+    columns = manifest['scaler']['columns']
+    if len(arrays['scaler.mean']) != len(columns) or len(arrays['scaler.scale']) != len(columns):
+        raise ValueError("Model artifact scaler arrays don't match its columns")
+
+
+def load_arrays(models_dir, manifest, names, verify=None):
+    """Memory-mapped arrays ``names`` of the artifact, checked against the manifest (checksums if ``verify``)"""
+    if verify is None:
+        verify = VERIFY
+    directory = artifact_dir(models_dir)
+    arrays = {}
+    for name in names:
+        entry = manifest['arrays'].get(name)
+        if entry is None:
+            continue
+        path = os.path.join(directory, entry['file'])
+        if verify and file_sha256(path) != entry['sha256']:
+            raise ValueError(f"Checksum mismatch for {ARTIFACT_DIR}/{entry['file']}")
+        arrays[name] = np.load(path, mmap_mode="r", allow_pickle=False)
+        if list(arrays[name].shape) != entry['shape']:
+            raise ValueError(f"{ARTIFACT_DIR}/{entry['file']} has shape {arrays[name].shape}, "
+                             f"expected {tuple(entry['shape'])}")
+    _check_schema(arrays, names)
+    return arrays
+
+
+def load_artifact(models_dir=MODELS_DIR, verify=None):
+    """(model, scaler, feature_columns, mappings) like load_models, from memory-mapped arrays"""
+    manifest = read_manifest(models_dir)
+    arrays = load_arrays(models_dir, manifest, SCHEMA, verify)
+    _validate(manifest, arrays)
+
+    model = manifest['model']
+    forest = FlatForest.from_arrays({name.split(".", 1)[1]: arrays[name] for name in SCHEMA
+                                     if name.startswith("forest.") and name != 'forest.feature_importances'},
+                                    model['classes'], model['n_features'])
+    forest.feature_importances_ = arrays['forest.feature_importances']
+    scaler = ScalerStats(manifest['scaler']['columns'], arrays['scaler.mean'], arrays['scaler.scale'])
+    return forest, scaler, list(manifest['feature_columns']), manifest['mappings']
+
+
+def convert(models_dir=MODELS_DIR, calibration=None):
+    """Write the artifact for the pickles in ``models_dir``; returns its manifest"""
+    from cardiocare.models import load_pickles, model_version
+
+    version = model_version(models_dir, use_artifact=False)
+    if calibration is None:
+        # Keep a calibration fitted to this same model
+        from cardiocare.calibration import load_calibration
+        calibration = load_calibration(models_dir, expected_version=version)
+    return write_artifact(models_dir, *load_pickles(models_dir), model_version=version, calibration=calibration)
+
+
+def write_artifact(models_dir, model, scaler, feature_columns, mappings, model_version, calibration=None):
+    """
+    Write the artifact for a fitted forest and scaler, with the optional
+    ``Calibration`` of its probabilities; returns its manifest
+    """
+    forest = FlatForest.from_estimator(model)
+    columns = list(getattr(scaler, "feature_names_in_", []))
+    if not columns:
+        from cardiocare.encoder import NUM_COLS
+        columns = NUM_COLS
+    arrays = {f"forest.{name}": array for name, array in forest.arrays().items()}
+    arrays['forest.feature_importances'] = np.asarray(forest.feature_importances_, dtype=np.float64)
+    arrays['scaler.mean'] = np.asarray(scaler.mean_, dtype=np.float64)
+    arrays['scaler.scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+    if calibration is not None:
+        arrays['calibration.x'] = calibration.x
+        arrays['calibration.y'] = calibration.y
+
+    manifest = {
+        'format': FORMAT,
+        'format_version': FORMAT_VERSION,
+        'model_version': model_version,
+        'created': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        'model': {'type': 'flat_forest', 'classes': np.asarray(model.classes_).tolist(),
+                  'n_features': int(model.n_features_in_), 'n_estimators': int(forest.n_estimators)},
+        'scaler': {'columns': [str(col) for col in columns]},
+        'feature_columns': [str(col) for col in feature_columns],
+        'mappings': mappings,
+        'sources': {name: _source(os.path.join(models_dir, name)) for name in MODEL_FILES
+                    if os.path.exists(os.path.join(models_dir, name))},
+        'arrays': {},
+    }
+    if calibration is not None:
+        manifest['calibration'] = calibration.describe()
+
+    # Build next to the old artifact, then swap directories
+    directory = artifact_dir(models_dir)
+    staging = f"{directory}.{os.getpid()}.tmp"
+    os.makedirs(staging)
+    try:
+        for name, array in arrays.items():
+            path = os.path.join(staging, f"{name}.npy")
+            array = np.ascontiguousarray(array, dtype={**SCHEMA, **CALIBRATION_SCHEMA}[name][0])
+            np.save(path, array, allow_pickle=False)
+            manifest['arrays'][name] = {'file': f"{name}.npy", 'dtype': array.dtype.str,
+                                        'shape': list(array.shape), 'sha256': file_sha256(path)}
+        with open(os.path.join(staging, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2)
+        if os.path.exists(directory):
+            retired = f"{directory}.{os.getpid()}.old"
+            os.replace(directory, retired)
+            os.replace(staging, directory)
+            shutil.rmtree(retired)
+        else:
+            os.replace(staging, directory)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert models/*.pkl into the pickle-free model artifact")
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--check", action="store_true", help="only validate the existing artifact and time a load")
+    args = parser.parse_args(argv)
+
+    if not args.check:
+        start = time.perf_counter()
+        manifest = convert(args.models_dir)
+        size = sum(os.path.getsize(os.path.join(artifact_dir(args.models_dir), entry['file']))
+                   for entry in manifest['arrays'].values())
+        print(f"Wrote {artifact_dir(args.models_dir)} ({size / 2**20:.1f} MiB, model {manifest['model_version']}) "
+              f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    for verify in (False, True):
+        start = time.perf_counter()
+        load_artifact(args.models_dir, verify=verify)
+        print(f"Load{' + checksums' if verify else ''}: {(time.perf_counter() - start) * 1e3:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Bulk scoring of CSV/Parquet files in fixed-size chunks.
+
+Input can be in the raw ``cardio_train.csv`` layout (``;``-separated, age in
+days, gender 1/2) or the ``cardio_preprocessed.csv`` layout. Each chunk is
+encoded, scored and appended to the output, so memory stays bounded by the
+chunk size rather than the file size:
+
+    python -m cardiocare.batch data/cardio_train.csv scores.csv --chunksize 50000
+
+``--workers N`` scores each chunk on N processes sharing one copy of the
+forest (see ``cardiocare.parallel``); the output is identical for any N.
+
+Rows failing the data-quality checks (see ``cardiocare.quality``) are not
+scored; they go to ``OUTPUT.rejected.csv`` (``--rejected``) with their
+reasons. ``--drop-duplicates`` also rejects repeated rows.
+
+Parquet input/output (``.parquet``) needs the optional ``pyarrow`` package.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from cardiocare.calibration import load_calibration
+from cardiocare.forest import FlatForest
+from cardiocare.health import (blood_pressure_categories, bmi_categories, calculate_bmi,
+                               count_risk_factors_array)
+from cardiocare.metrics import span
+from cardiocare.models import MODELS_DIR, load_models, model_version
+from cardiocare.quality import QualityFilter
+from cardiocare.scoring import Scorer
+
+DEFAULT_CHUNKSIZE = 50_000
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+
+def _is_parquet(name):
+    return str(name).lower().endswith(PARQUET_SUFFIXES)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet support needs pyarrow: pip install pyarrow") from None
+    return pa, pq
+
+
+def _sniff_sep(source):
+    """';' for the raw cardio_train.csv layout, ',' otherwise"""
+    if hasattr(source, "read"):
+        position = source.tell()
+        header = source.readline()
+        source.seek(position)
+    else:
+        with open(source, "rb") as f:
+            header = f.readline()
+    if isinstance(header, bytes):
+        header = header.decode("utf-8", errors="replace")
+    return ";" if header.count(";") > header.count(",") else ","
+
+
+def iter_chunks(source, chunksize=DEFAULT_CHUNKSIZE, name=None):
+    """Yield DataFrames of at most ``chunksize`` rows from a path or file object"""
+    name = name or getattr(source, "name", source)
+    if _is_parquet(name):
+        _, pq = _require_pyarrow()
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, sep=_sniff_sep(source), chunksize=chunksize)
+
+
+class ChunkWriter:
+    """Appends DataFrames to a CSV or Parquet destination (path or binary file object)"""
+
+    def __init__(self, destination, name=None):
+        self.destination = destination
+        self.parquet = _is_parquet(name or getattr(destination, "name", destination))
+        self.rows = 0
+        self._writer = None
+        self._header = True
+
+    def write(self, frame):
+        if self.parquet:
+            pa, pq = _require_pyarrow()
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.destination, table.schema)
+            self._writer.write_table(table)
+        elif self._header or len(frame):
+            # The header is written even when nothing passes, so the file always exists
+            frame.to_csv(self.destination, mode="w" if self._header else "a", header=self._header, index=False)
+            self._header = False
+        self.rows += len(frame)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def score_frame(scorer, chunk, threshold=None):
+    """Probabilities and risk categories for one input chunk; ``threshold`` defaults to the scorer's"""
+    if threshold is None:
+        threshold = scorer.decision_threshold
+    encoder = scorer.encoder
+    features = encoder.raw_features(chunk)
+    probability = scorer.score(encoder.encode_features(features))
+
+    bmi = calculate_bmi(features['height'], chunk['weight'].to_numpy(dtype=np.float64))
+    lifestyle_risk, medical_risk = count_risk_factors_array(features, bmi, encoder.mappings)
+
+    result = pd.DataFrame(index=chunk.index)
+    if "id" in chunk.columns:
+        result["id"] = chunk["id"].to_numpy()
+    result["probability"] = probability
+    result["prediction"] = (probability >= threshold).astype(np.int8)
+    result["bmi"] = bmi
+    result["bmi_category"] = bmi_categories(bmi)
+    result["bp_category"] = blood_pressure_categories(features['ap_hi'], features['ap_lo'])
+    result["lifestyle_risk"] = lifestyle_risk.astype(np.int8)
+    result["medical_risk"] = medical_risk.astype(np.int8)
+    result["total_risk"] = (lifestyle_risk + medical_risk).astype(np.int8)
+    return result
+
+
+def score_file(scorer, source, destination, chunksize=DEFAULT_CHUNKSIZE, threshold=None,
+               source_name=None, destination_name=None, progress=None, quality=None, rejected=None):
+    """
+    Stream ``source`` through the scorer into ``destination`` (path or binary
+    file object). Output format follows the destination name. Rows rejected
+    by ``quality`` (a QualityFilter; checks off when None) are skipped and,
+    when ``rejected`` is given, written there as CSV with their reasons.
+    Returns the number of rows written.
+    """
+    writer = ChunkWriter(destination, destination_name)
+    rejected_writer = ChunkWriter(rejected, "rejected.csv") if rejected is not None else None
+    try:
+        for chunk in iter_chunks(source, chunksize, name=source_name):
+            if quality is not None:
+                chunk, dropped = quality.split(chunk)
+                if rejected_writer is not None:
+                    rejected_writer.write(dropped)
+            with span("batch.chunk"):
+                result = score_frame(scorer, chunk, threshold)
+            writer.write(result)
+            if progress is not None:
+                progress(writer.rows)
+    finally:
+        writer.close()
+        if rejected_writer is not None:
+            rejected_writer.close()
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file of patients in chunks")
+    parser.add_argument("input", help="cardio_train.csv-style or cardio_preprocessed.csv-style file")
+    parser.add_argument("output", help="output .csv or .parquet file")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--threshold", type=float,
+                        help="decision threshold (default: the calibration's, else 0.5)")
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes sharing the forest (0 = one per CPU, 1 = in-process)")
+    parser.add_argument("--rejected", help="rows failing the quality checks (default: OUTPUT.rejected.csv)")
+    parser.add_argument("--drop-duplicates", action="store_true", help="also reject repeated rows")
+    args = parser.parse_args(argv)
+    rejected_path = args.rejected or f"{os.path.splitext(args.output)[0]}.rejected.csv"
+
+    scorer = Scorer(*load_models(args.models_dir),
+                    calibration=load_calibration(args.models_dir, expected_version=model_version(args.models_dir)))
+    if args.workers != 1:
+        from cardiocare.parallel import ParallelForest
+
+        scorer.pool = ParallelForest(scorer.engine or FlatForest.from_estimator(scorer.model),
+                                     args.workers or None)
+
+    start = time.perf_counter()
+
+    def progress(rows):
+        print(f"\r{rows:,} rows scored ({time.perf_counter() - start:.1f}s)", end="", file=sys.stderr)
+
+    # Write to temporary names so a failed run never leaves a partial output
+    partial, rejected_partial = args.output + ".partial", rejected_path + ".partial"
+    quality = QualityFilter(drop_duplicates=args.drop_duplicates)
+    try:
+        rows = score_file(scorer, args.input, partial, args.chunksize, args.threshold,
+                          destination_name=args.output, progress=progress,
+                          quality=quality, rejected=rejected_partial)
+    except BaseException:
+        for path in (partial, rejected_partial):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    finally:
+        if scorer.pool is not None:
+            scorer.pool.close()
+    os.replace(partial, args.output)
+    os.replace(rejected_partial, rejected_path)
+    print(f"\nWrote {rows:,} rows to {args.output}", file=sys.stderr)
+    if quality.rejected:
+        reasons = ", ".join(f"{reason} {count:,}" for reason, count in quality.counts.items())
+        print(f"Rejected {quality.rejected:,} rows ({reasons}) to {rejected_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Benchmarks for the latency-sensitive paths, with a regression check.
+
+Stages (milliseconds: median, p95 and min over the repeats):
+
+    predict    Predict Risk encode + predict_proba, one row and 1000 rows
+    load       load_models() and load_frame("cardio_preprocessed"), cold
+               (first call in a fresh interpreter) and warm (repeat calls)
+    analysis   Model Analysis page render, first visit and rerun
+    training   the notebook's preprocessing, grid search and fit
+               (cardiocare.training into a temporary directory; slow, so
+               it only runs when named)
+
+Usage:
+
+    python -m cardiocare.benchmark --json bench.json
+    python -m cardiocare.benchmark --compare bench.json        # exit 1 on regressions
+    python -m cardiocare.benchmark --stages predict load training
+
+A result is a regression when its median is more than ``--tolerance``
+slower than the baseline's and by at least ``--min-delta-ms``. "Cold"
+loads start a new process, but the OS page cache may still be warm.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from cardiocare.models import MODELS_DIR
+
+ROOT = os.path.dirname(MODELS_DIR)
+DEFAULT_STAGES = ["predict", "load", "analysis"]
+
+# Form record scored by the single-row benchmark (the form's defaults)
+RECORD = {'age_years': 50, 'gender': "Male", 'height': 170, 'weight': 70, 'ap_hi': 120, 'ap_lo': 80,
+          'cholesterol': "normal", 'gluc': "normal", 'smoke': "no", 'alco': "no", 'active': "yes"}
+BATCH_ROWS = 1000
+
+
+def summarize(seconds):
+    ms = np.asarray(seconds, dtype=np.float64) * 1e3
+    return {'median_ms': round(float(np.median(ms)), 3), 'p95_ms': round(float(np.percentile(ms, 95)), 3),
+            'min_ms': round(float(ms.min()), 3), 'repeats': int(len(ms))}
+
+
+def measure(fn, repeats, warmup=1):
+    for _ in range(warmup):
+        fn()
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - start)
+    return summarize(seconds)
+
+
+def measure_cold(setup, statement, repeats):
+    """``statement`` timed as the first call in a fresh interpreter, after ``setup``"""
+    code = (f"import time\n{setup}\nstart = time.perf_counter()\n{statement}\n"
+            f"print(time.perf_counter() - start)")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])),
+               PYTHONWARNINGS="ignore")
+    seconds = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT, env=env)
+        seconds.append(float(out.stdout.split()[-1]))
+    return summarize(seconds)
+
+
+def bench_predict(repeats):
+    from cardiocare.dataset import load_frame
+    from cardiocare.encoder import INPUT_FIELDS
+    from cardiocare.models import load_models
+    from cardiocare.scoring import Scorer
+
+    # No prediction cache: every repeat walks the forest
+    scorer = Scorer(*load_models())
+    records = load_frame("cardio_preprocessed").head(BATCH_ROWS)[INPUT_FIELDS].to_dict("records")
+
+    def score(rows):
+        return lambda: scorer.predict_proba(scorer.encoder.encode_records(rows))
+
+    return {
+        'predict.single_row': measure(score([RECORD]), repeats * 20, warmup=5),
+        f'predict.batch_{BATCH_ROWS}': measure(score(records), repeats),
+    }
+
+
+def bench_load(repeats):
+    from cardiocare.dataset import load_frame
+    from cardiocare.models import load_models
+
+    return {
+        'load_models.cold': measure_cold("from cardiocare.models import load_models", "load_models()", repeats),
+        'load_models.warm': measure(load_models, repeats),
+        'load_frame.cold': measure_cold("from cardiocare.dataset import load_frame",
+                                        "load_frame('cardio_preprocessed')", repeats),
+        'load_frame.warm': measure(lambda: load_frame("cardio_preprocessed"), repeats),
+    }
+
+
+def bench_analysis(repeats):
+    from streamlit.testing.v1 import AppTest
+
+    from cardiocare.views import PAGES
+
+    page = next(label for label, module in PAGES.items() if module.endswith(".analysis"))
+    app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=300).run()
+    radio = app.radio(key="navigation")
+
+    # The first visit imports the page and renders (and caches) every chart
+    start = time.perf_counter()
+    radio.set_value(page).run()
+    cold = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(f"Model Analysis failed to render: {app.exception[0].value}")
+    return {
+        'analysis_page.cold': summarize([cold]),
+        'analysis_page.warm': measure(lambda: app.run(), repeats, warmup=0),
+    }
+
+
+def bench_training(repeats, param_grid=None):
+    from cardiocare import training
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        manifest = training.train(models_dir, param_grid=param_grid or training.PARAM_GRID,
+                                  evaluate=False, calibrate=False, verbose=False)
+    results = {f'training.{stage}': summarize([seconds]) for stage, seconds in manifest['timings'].items()}
+    results['training.total'] = summarize([sum(manifest['timings'].values())])
+    return results
+
+
+STAGES = {
+    'predict': bench_predict,
+    'load': bench_load,
+    'analysis': bench_analysis,
+    'training': bench_training,
+}
+
+
+def environment():
+    import numpy
+    import pandas
+
+    from cardiocare.models import model_version
+
+    versions = {'python': platform.python_version(), 'numpy': numpy.__version__, 'pandas': pandas.__version__}
+    for name in ('sklearn', 'streamlit'):
+        try:
+            versions[name] = __import__(name).__version__
+        except ImportError:
+            versions[name] = None
+    return {
+        **versions,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'model_version': model_version(),
+        'settings': {key: value for key, value in os.environ.items() if key.startswith("CARDIOCARE_")},
+    }
+
+
+def run(stages=DEFAULT_STAGES, repeats=5, param_grid=None, verbose=True):
+    results = {}
+    for stage in stages:
+        start = time.perf_counter()
+        kwargs = {'param_grid': param_grid} if stage == 'training' else {}
+        results.update(STAGES[stage](repeats, **kwargs))
+        if verbose:
+            print(f"[{stage}] {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        'environment': environment(),
+        'results': results,
+    }
+
+
+def compare(report, baseline, tolerance=0.2, min_delta_ms=1.0):
+    """[(name, baseline median, current median, ratio, regressed)] for results in both reports"""
+    rows = []
+    for name, result in report['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        before, after = base['median_ms'], result['median_ms']
+        ratio = after / before if before else float("inf")
+        regressed = ratio > 1 + tolerance and after - before >= min_delta_ms
+        rows.append((name, before, after, ratio, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark prediction, loading, page render and training")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES) + ["all"], default=DEFAULT_STAGES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--param-grid", type=json.loads, default=None,
+                        help="JSON grid for the training stage (defaults to the notebook's grid)")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--compare", help="baseline report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown of a median (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    stages = list(STAGES) if "all" in args.stages else args.stages
+    report = run(stages, args.repeats, args.param_grid)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if not args.compare:
+        print(f"{'benchmark':<28}{'median ms':>12}{'p95 ms':>12}{'min ms':>12}")
+        for name, result in report['results'].items():
+            print(f"{name:<28}{result['median_ms']:>12.2f}{result['p95_ms']:>12.2f}{result['min_ms']:>12.2f}")
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    rows = compare(report, baseline, args.tolerance, args.min_delta_ms)
+    print(f"{'benchmark':<28}{'baseline ms':>12}{'current ms':>12}{'change':>9}")
+    for name, before, after, ratio, regressed in rows:
+        print(f"{name:<28}{before:>12.2f}{after:>12.2f}{ratio - 1:>+9.0%}{'  REGRESSION' if regressed else ''}")
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Prediction cache for repeated patient profiles.
+
+Form inputs are small integer domains, so the same encoded feature rows
+come back again and again. Results are kept in a bounded LRU keyed on
+the model version and the encoded row's bytes; a repeat lookup skips
+scaling and the forest walk entirely.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+def prediction_key(version, row):
+    """Cache key of one encoded float32 feature row"""
+    return (version, row.tobytes())
+
+
+class PredictionCache:
+    """Thread-safe LRU of class probabilities, bounded by entries"""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        """Cached probabilities for ``key``, or None (counted as a miss)"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        value.flags.writeable = False
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions}
@@ -0,0 +1,181 @@
+"""
+Probability calibration for the forest's vote fractions.
+
+A Random Forest's positive-class probability is the mean of its trees'
+leaf fractions, which is pulled towards the middle and isn't a risk in
+the calibrated sense. ``python -m cardiocare.calibration`` fits a
+monotone map from that fraction to the observed outcome rate on one half
+of the held-out test split (isotonic regression, or Platt's sigmoid with
+``--method platt``) and reports Brier score and calibration error before
+and after on the other half. The map is stored in the model artifact (see
+cardiocare.artifact) as a piecewise-linear lookup: two short arrays of
+knots, applied with one ``np.interp`` per batch.
+
+The decision threshold (``--threshold``, default 0.5) is stored with it
+and used wherever a prediction is thresholded; refits keep the current
+one. Set CARDIOCARE_CALIBRATION=0 to serve the raw vote fractions.
+
+    python -m cardiocare.calibration
+    python -m cardiocare.calibration --method platt --threshold 0.45
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from cardiocare.models import MODELS_DIR
+
+METHODS = ("isotonic", "platt")
+# Knots of the Platt sigmoid's piecewise-linear lookup
+PLATT_KNOTS = 101
+CALIBRATION_BINS = 10
+# Bounds of the calibrated probability: the few rows in isotonic regression's
+# end blocks would otherwise make some risks a certain 0% or 100%
+MIN_PROBABILITY, MAX_PROBABILITY = 0.01, 0.99
+
+ENABLED = os.environ.get("CARDIOCARE_CALIBRATION", "1") != "0"
+
+
+class Calibration:
+    """Piecewise-linear map from raw to calibrated probability, plus the decision threshold"""
+
+    def __init__(self, x, y, method="isotonic", threshold=0.5, report=None):
+        self.x = x
+        self.y = y
+        self.method = method
+        self.threshold = threshold
+        self.report = report or {}
+
+    def __call__(self, probability):
+        return np.interp(probability, self.x, self.y)
+
+    def describe(self):
+        """Manifest entry, without the knot arrays"""
+        return {'method': self.method, 'threshold': self.threshold, 'knots': int(len(self.x)), **self.report}
+
+
+def fit(probability, y_true, method="isotonic", threshold=0.5):
+    """Calibration of raw probabilities ``probability`` against 0/1 outcomes ``y_true``"""
+    probability = np.asarray(probability, dtype=np.float64)
+    if method == "isotonic":
+        from sklearn.isotonic import IsotonicRegression
+
+        isotonic = IsotonicRegression(y_min=MIN_PROBABILITY, y_max=MAX_PROBABILITY,
+                                      out_of_bounds="clip").fit(probability, y_true)
+        # IsotonicRegression.predict interpolates linearly between exactly these knots
+        x, y = isotonic.X_thresholds_, isotonic.y_thresholds_
+    elif method == "platt":
+        from sklearn.linear_model import LogisticRegression
+
+        platt = LogisticRegression(C=np.inf).fit(probability[:, None], y_true)
+        x = np.linspace(0.0, 1.0, PLATT_KNOTS)
+        y = np.clip(platt.predict_proba(x[:, None])[:, 1], MIN_PROBABILITY, MAX_PROBABILITY)
+    else:
+        raise ValueError(f"Unknown calibration method {method!r}; expected one of {', '.join(METHODS)}")
+    return Calibration(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64), method, threshold)
+
+
+def calibration_error(probability, y_true, bins=CALIBRATION_BINS):
+    """Expected calibration error over equal-width probability bins"""
+    which = np.minimum((np.asarray(probability) * bins).astype(int), bins - 1)
+    counts = np.bincount(which, minlength=bins)
+    predicted = np.bincount(which, weights=probability, minlength=bins)
+    observed = np.bincount(which, weights=y_true, minlength=bins)
+    filled = counts > 0
+    return float(np.abs(predicted[filled] - observed[filled]).sum() / len(probability))
+
+
+def evaluate(calibration, probability, y_true):
+    """Brier score, calibration error and accuracy at the threshold, raw and calibrated"""
+    calibrated = calibration(probability)
+    report = {}
+    for name, p in (('raw', probability), ('calibrated', calibrated)):
+        report[name] = {
+            'brier': float(np.mean((p - y_true) ** 2)),
+            'ece': calibration_error(p, y_true),
+            'accuracy': float(np.mean((p >= calibration.threshold) == y_true)),
+        }
+    return report
+
+
+def split_halves(test_idx):
+    """(fit, report) halves of the held-out rows: the calibration is fitted on one, evaluated on the other"""
+    from cardiocare.evaluation import RANDOM_STATE
+
+    test_idx = np.random.RandomState(RANDOM_STATE).permutation(test_idx)
+    return test_idx[:len(test_idx) // 2], test_idx[len(test_idx) // 2:]
+
+
+def load_calibration(models_dir=MODELS_DIR, expected_version=None, verify=None):
+    """The artifact's calibration, or None when there is none, it is off or the artifact is stale"""
+    from cardiocare import artifact
+
+    if not ENABLED or not artifact.is_current(models_dir):
+        return None
+    manifest = artifact.read_manifest(models_dir)
+    entry = manifest.get('calibration')
+    if entry is None or (expected_version is not None and manifest['model_version'] != expected_version):
+        return None
+    arrays = artifact.load_arrays(models_dir, manifest, artifact.CALIBRATION_SCHEMA, verify)
+    report = {key: value for key, value in entry.items() if key not in ('method', 'threshold', 'knots')}
+    # A few hundred bytes: np.interp is faster on in-memory copies than on the memory maps
+    return Calibration(np.array(arrays['calibration.x']), np.array(arrays['calibration.y']),
+                       entry['method'], entry['threshold'], report)
+
+
+def current_threshold(models_dir=MODELS_DIR, default=0.5):
+    """Decision threshold of the artifact's calibration, whichever model it was fitted to"""
+    from cardiocare import artifact
+
+    try:
+        return artifact.read_manifest(models_dir)['calibration']['threshold']
+    except (OSError, ValueError, KeyError, TypeError):
+        return default
+
+
+def main(argv=None):
+    from cardiocare.artifact import convert
+    from cardiocare.dataset import DATA_DIR, load_frame
+    from cardiocare.evaluation import split_indices
+    from cardiocare.models import load_models
+    from cardiocare.quality import clean_mask
+    from cardiocare.scoring import Scorer
+
+    parser = argparse.ArgumentParser(description="Fit the probability calibration and store it in the model artifact")
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--method", choices=METHODS, default="isotonic")
+    parser.add_argument("--threshold", type=float,
+                        help="decision threshold on the calibrated probability (default: the current one, else 0.5)")
+    args = parser.parse_args(argv)
+    if args.threshold is None:
+        args.threshold = current_threshold(args.models_dir)
+    if not 0.0 < args.threshold < 1.0:
+        parser.error("--threshold must be between 0 and 1")
+
+    # Raw vote fractions on the held-out split: one half fits, the other is reported on
+    scorer = Scorer(*load_models(args.models_dir))
+    df = load_frame("cardio_preprocessed", args.data_dir)
+    _, test_idx = split_indices(len(df), keep=clean_mask(df))
+    fit_idx, report_idx = split_halves(test_idx)
+    probability = {}
+    for name, idx in (('fit', fit_idx), ('report', report_idx)):
+        rows = df.iloc[idx]
+        probability[name] = (scorer.score(scorer.encoder.encode(rows)), rows['cardio'].to_numpy())
+
+    calibration = fit(*probability['fit'], method=args.method, threshold=args.threshold)
+    report = evaluate(calibration, *probability['report'])
+    calibration.report = {'n_fit': int(len(fit_idx)), 'n_report': int(len(report_idx)), **report}
+    manifest = convert(args.models_dir, calibration=calibration)
+
+    print(f"{args.method} calibration, {len(calibration.x)} knots, threshold {args.threshold:g}, "
+          f"model {manifest['model_version']}", file=sys.stderr)
+    print(f"{'':<12}{'Brier':>9}{'ECE':>9}{'accuracy':>10}", file=sys.stderr)
+    for name, row in report.items():
+        print(f"{name:<12}{row['brier']:>9.4f}{row['ece']:>9.4f}{row['accuracy']:>10.2%}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
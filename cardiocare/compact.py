@@ -0,0 +1,330 @@
+"""
+Compact forest artifact ("compact mode") for memory-bound replicas.
+
+The fitted forest is re-encoded into a few small NumPy arrays:
+
+* optionally only a subset of the trees, picked greedily (forward selection
+  by Brier score) on half of the held-out split;
+* split thresholds mapped back through the scaler onto the raw, whole-number
+  model inputs and stored as int16, so rows are compared unscaled;
+* leaf probabilities of the positive class as uint8 or uint16 fractions;
+* split nodes only: a child index ``< 0`` is the leaf ``~index``.
+
+The arrays go to ``models/compact_forest.npz`` and the label mappings plus
+an accuracy/AUC, memory and latency report against the original model
+(measured on the other half of the held-out split) to ``compact_forest.json``.
+Nothing is written if the AUC drops by more than ``--max-auc-drop``.
+Scoring needs only NumPy, not sklearn or the pickles:
+
+    python -m cardiocare.compact --trees 50 --leaf-dtype uint8
+    CARDIOCARE_SCORER=compact streamlit run app.py
+    python -m cardiocare.service --scorer compact
+
+Numeric inputs are rounded to whole numbers, as in the form and the data.
+Loading refuses a compact forest built for another model than the one in
+models/.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from cardiocare.calibration import load_calibration
+from cardiocare.encoder import FeatureEncoder
+from cardiocare.forest import BLOCK_SIZE, FlatForest
+from cardiocare.health import summarize
+from cardiocare.metrics import span
+from cardiocare.models import MODELS_DIR, installed_version
+
+FORMAT_VERSION = 1
+COMPACT_FILE = "compact_forest.npz"
+COMPACT_MANIFEST = "compact_forest.json"
+
+LEAF_DTYPES = ("uint8", "uint16")
+# Largest held-out AUC loss accepted; a worse compact forest isn't written
+MAX_AUC_DROP = 0.005
+THRESHOLD_RANGE = np.iinfo(np.int16)
+
+
+def raw_thresholds(flat, encoder):
+    """int16 thresholds on the whole-number inputs: ``x > t`` exactly where the scaled split goes right"""
+    scaled = flat.threshold[~flat.is_leaf]
+    features = flat.feature[~flat.is_leaf]
+    mean = np.zeros(encoder.n_features)
+    scale = np.ones(encoder.n_features)
+    for j, col in enumerate(encoder.feature_columns):
+        mean[j], scale[j] = encoder.scaling.get(col, (0.0, 1.0))
+    raw = np.floor(scaled * scale[features] + mean[features])
+    # The largest whole number the forest itself sends left, found by encoding
+    # the neighbouring candidates exactly as FeatureEncoder does (float32)
+    threshold = raw - 1
+    for candidate in (raw, raw + 1):
+        encoded = ((candidate - mean[features]) / scale[features]).astype(np.float32)
+        threshold = np.where(encoded <= scaled, candidate, threshold)
+    if threshold.min() < THRESHOLD_RANGE.min or threshold.max() > THRESHOLD_RANGE.max:
+        raise ValueError("Split thresholds don't fit in int16")
+    return threshold.astype(np.int16)
+
+
+def compress(flat, encoder, trees=None, leaf_dtype="uint8"):
+    """Compact arrays for the trees ``trees`` (indices into ``flat``, default all)"""
+    if len(flat.classes_) != 2:
+        raise ValueError("Compact forests store one probability per leaf: binary models only")
+    trees = np.arange(flat.n_estimators) if trees is None else np.asarray(trees)
+    ends = np.append(flat.roots[1:], len(flat.feature))
+
+    # Nodes of the kept trees, renumbered: split nodes and leaves counted separately
+    nodes = np.concatenate([np.arange(flat.roots[t], ends[t]) for t in trees])
+    kept = np.zeros(len(flat.feature), dtype=bool)
+    kept[nodes] = True
+    split = kept & ~flat.is_leaf
+    leaf = kept & flat.is_leaf
+    code = np.full(len(flat.feature), -1, dtype=np.int64)
+    code[split] = np.arange(np.count_nonzero(split))
+    code[leaf] = ~np.arange(np.count_nonzero(leaf))
+
+    levels = np.iinfo(leaf_dtype).max
+    positive = flat.value[leaf, 1]
+    thresholds = raw_thresholds(flat, encoder)[split[~flat.is_leaf]]
+    return {
+        'feature': flat.feature[split].astype(np.uint8),
+        'threshold': thresholds,
+        'children': code[flat.children.reshape(-1, 2)[split]].astype(np.int32).ravel(),
+        'leaf_value': np.rint(positive * levels).astype(leaf_dtype),
+        'roots': code[flat.roots[trees]].astype(np.int32),
+    }
+
+
+def select_trees(flat, X, y, n_trees):
+    """Greedy forward selection of ``n_trees`` trees minimizing the Brier score on (X, y)"""
+    # Positive-class probability of every tree on every row, (trees, rows)
+    P = flat.value[flat.apply(X), 1].T
+    y = np.asarray(y, dtype=np.float64)
+    total = np.zeros(len(y))
+    chosen = []
+    available = np.ones(len(P), dtype=bool)
+    for k in range(1, n_trees + 1):
+        brier = (((total + P) / k - y) ** 2).mean(axis=1)
+        brier[~available] = np.inf
+        best = int(np.argmin(brier))
+        chosen.append(best)
+        available[best] = False
+        total += P[best]
+    return sorted(chosen)
+
+
+class CompactForest:
+    """Scorer-compatible predictions from the compact arrays"""
+
+    def __init__(self, arrays, manifest, calibration=None):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.children = arrays['children']
+        self.leaf_value = arrays['leaf_value']
+        self.roots = arrays['roots']
+        self.manifest = manifest
+        self.version = manifest['model_version']
+        self.n_estimators = len(self.roots)
+        self.levels = int(np.iinfo(self.leaf_value.dtype).max)
+        # Raw (unscaled) features in the model's column order
+        self.encoder = FeatureEncoder(manifest['feature_columns'], manifest['mappings'], scaler=None)
+        # Optional Calibration of the forest's probabilities (see cardiocare.calibration)
+        self.calibration = calibration
+        self.decision_threshold = calibration.threshold if calibration is not None else 0.5
+
+    @classmethod
+    def load(cls, models_dir=MODELS_DIR):
+        with open(os.path.join(models_dir, COMPACT_MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"{COMPACT_MANIFEST} has an unsupported format; rebuild it")
+        current = installed_version(models_dir)
+        if current is not None and current != manifest['model_version']:
+            raise ValueError(f"{COMPACT_FILE} was built for model {manifest['model_version']}, "
+                             f"the installed model is {current}; rebuild it")
+        with np.load(os.path.join(models_dir, COMPACT_FILE), allow_pickle=False) as npz:
+            arrays = {key: npz[key] for key in npz.files}
+        return cls(arrays, manifest, load_calibration(models_dir, expected_version=manifest['model_version']))
+
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.feature, self.threshold, self.children,
+                                              self.leaf_value, self.roots))
+
+    def _leaves(self, xq, n_rows):
+        """Leaf index reached in every tree by every row, tree-major"""
+        n_features = self.encoder.n_features
+        node = np.repeat(self.roots, n_rows)
+        row_start = np.tile(np.arange(n_rows, dtype=np.int32) * n_features, self.n_estimators)
+        pos = np.flatnonzero(node >= 0)
+        current, start = node[pos], row_start[pos]
+        while pos.size:
+            went_right = xq[start + self.feature[current]] > self.threshold[current]
+            current = self.children[2 * current + went_right]
+            done = current < 0
+            if done.any():
+                node[pos[done]] = current[done]
+                walking = ~done
+                pos, current, start = pos[walking], current[walking], start[walking]
+        return ~node
+
+    def score(self, X):
+        """Probability of the positive class for an (unscaled) encoded matrix"""
+        with span("predict.predict_proba"):
+            X = np.asarray(X, dtype=np.float64)
+            xq = np.rint(np.clip(X, THRESHOLD_RANGE.min, THRESHOLD_RANGE.max)).astype(np.int16)
+            total = np.empty(len(X), dtype=np.int64)
+            step = max(1, BLOCK_SIZE // max(1, self.n_estimators))
+            for start in range(0, len(X), step):
+                rows = xq[start:start + step]
+                leaves = self._leaves(rows.ravel(), len(rows)).reshape(self.n_estimators, len(rows))
+                total[start:start + len(rows)] = self.leaf_value[leaves].sum(axis=0, dtype=np.int64)
+            probability = total / (self.levels * self.n_estimators)
+            return probability if self.calibration is None else self.calibration(probability)
+
+    def predict_proba(self, X):
+        probability = self.score(X)
+        return np.column_stack([1 - probability, probability])
+
+    def explain(self, X):
+        """Leaf values alone don't carry the path attributions"""
+        return None
+
+    def score_records(self, records):
+        probabilities = self.score(self.encoder.encode_records(records))
+        return [summarize(record, float(p), self.decision_threshold) for record, p in zip(records, probabilities)]
+
+
+def _latency_ms(score, X, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        score(X)
+        times.append(time.perf_counter() - start)
+    return round(float(np.median(times)) * 1e3, 3)
+
+
+def _metrics(y, probability):
+    from sklearn.metrics import roc_auc_score
+    return {'accuracy': float(np.mean((probability >= 0.5) == y)), 'roc_auc': float(roc_auc_score(y, probability))}
+
+
+def report(compact, scorer, features, y):
+    """Accuracy/AUC, memory and latency of the compact forest against the original model"""
+    X_scaled = scorer.encoder.encode_features(features)
+    X_raw = compact.encoder.encode_features(features)
+    original = scorer.score(X_scaled)
+    approximate = compact.score(X_raw)
+
+    if hasattr(scorer.model, "estimators_"):
+        model_bytes = sum(est.tree_.__getstate__()['nodes'].nbytes + est.tree_.value.nbytes
+                          for est in scorer.model.estimators_)
+    else:
+        # FlatForest from the pickle-free artifact
+        model_bytes = sum(array.nbytes for array in scorer.model.arrays().values())
+    rows = {
+        'original': {**_metrics(y, original), 'n_trees': scorer.engine.n_estimators if scorer.engine else
+                     len(scorer.model.estimators_),
+                     'model_bytes': int(model_bytes),
+                     'latency_ms_1_row': _latency_ms(scorer.score, X_scaled[:1], 50),
+                     'latency_ms_1000_rows': _latency_ms(scorer.score, X_scaled[:1000], 5)},
+        'compact': {**_metrics(y, approximate), 'n_trees': compact.n_estimators,
+                    'model_bytes': int(compact.nbytes()),
+                    'latency_ms_1_row': _latency_ms(compact.score, X_raw[:1], 50),
+                    'latency_ms_1000_rows': _latency_ms(compact.score, X_raw[:1000], 5)},
+    }
+    error = np.abs(approximate - original)
+    rows['delta'] = {
+        'rows': int(len(y)),
+        'accuracy': rows['compact']['accuracy'] - rows['original']['accuracy'],
+        'roc_auc': rows['compact']['roc_auc'] - rows['original']['roc_auc'],
+        'max_abs_error': float(error.max()),
+        'mean_abs_error': float(error.mean()),
+        'same_prediction': float(np.mean((approximate >= 0.5) == (original >= 0.5))),
+        'memory_ratio': rows['original']['model_bytes'] / rows['compact']['model_bytes'],
+    }
+    return rows
+
+
+def write_compact(arrays, manifest, models_dir=MODELS_DIR):
+    """Write the arrays, then the manifest that makes them current"""
+    tmp = os.path.join(models_dir, f".{COMPACT_FILE}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, os.path.join(models_dir, COMPACT_FILE))
+    tmp = os.path.join(models_dir, f".{COMPACT_MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(models_dir, COMPACT_MANIFEST))
+
+
+def main(argv=None):
+    from cardiocare.dataset import DATA_DIR, load_frame
+    from cardiocare.evaluation import RANDOM_STATE, split_indices
+    from cardiocare.models import load_models, model_version
+    from cardiocare.quality import clean_mask
+    from cardiocare.scoring import Scorer
+
+    parser = argparse.ArgumentParser(description="Build the compact forest and report its accuracy/memory/latency")
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--trees", type=int, default=None, help="keep this many trees (default all)")
+    parser.add_argument("--leaf-dtype", choices=LEAF_DTYPES, default="uint8")
+    parser.add_argument("--max-auc-drop", type=float, default=MAX_AUC_DROP,
+                        help="refuse to write a compact forest that loses more held-out AUC")
+    args = parser.parse_args(argv)
+
+    scorer = Scorer(*load_models(args.models_dir))
+    flat = scorer.engine or FlatForest.from_estimator(scorer.model)
+
+    # Held-out split: one half picks the trees, the other half is reported on
+    df = load_frame("cardio_preprocessed", args.data_dir)
+    _, test_idx = split_indices(len(df), keep=clean_mask(df))
+    test_idx = np.random.RandomState(RANDOM_STATE).permutation(test_idx)
+    select_idx, report_idx = test_idx[:len(test_idx) // 2], test_idx[len(test_idx) // 2:]
+
+    trees = None
+    if args.trees is not None and args.trees < flat.n_estimators:
+        select = df.iloc[select_idx]
+        trees = select_trees(flat, scorer.encoder.encode(select), select['cardio'].to_numpy(), args.trees)
+
+    start = time.perf_counter()
+    arrays = compress(flat, scorer.encoder, trees, args.leaf_dtype)
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'model_version': model_version(args.models_dir),
+        'feature_columns': scorer.encoder.feature_columns,
+        'mappings': scorer.encoder.mappings,
+        'leaf_dtype': args.leaf_dtype,
+        'trees': trees if trees is not None else "all",
+        'build_seconds': round(time.perf_counter() - start, 1),
+    }
+    evaluated = df.iloc[report_idx]
+    manifest['report'] = report(CompactForest(arrays, manifest), scorer,
+                                scorer.encoder.raw_features(evaluated), evaluated['cardio'].to_numpy())
+
+    rows = manifest['report']
+    print(f"{'':<10}{'trees':>7}{'accuracy':>10}{'AUC':>8}{'MiB':>9}{'1 row ms':>10}{'1000 rows ms':>14}")
+    for name in ('original', 'compact'):
+        row = rows[name]
+        print(f"{name:<10}{row['n_trees']:>7}{row['accuracy']:>10.2%}{row['roc_auc']:>8.4f}"
+              f"{row['model_bytes'] / 2**20:>9.1f}{row['latency_ms_1_row']:>10.2f}{row['latency_ms_1000_rows']:>14.1f}")
+    delta = rows['delta']
+    print(f"delta: accuracy {delta['accuracy']:+.2%}, AUC {delta['roc_auc']:+.4f}, "
+          f"mean |p error| {delta['mean_abs_error']:.4f}, same prediction {delta['same_prediction']:.2%}, "
+          f"{delta['memory_ratio']:.1f}x smaller ({delta['rows']:,} held-out rows)")
+
+    if -delta['roc_auc'] > args.max_auc_drop:
+        print(f"AUC drops by {-delta['roc_auc']:.4f} (> {args.max_auc_drop}); {COMPACT_FILE} not written",
+              file=sys.stderr)
+        return 1
+    write_compact(arrays, manifest, args.models_dir)
+    print(f"Wrote {COMPACT_FILE}: {rows['compact']['n_trees']} trees, {args.leaf_dtype} leaves", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+Typed columnar cache for the CSV datasets in data/.
+
+The first load of a dataset parses its CSV once and writes one ``.npy`` file
+per column with compact dtypes (int8 categoricals, int16 BP/height, float32
+weight) under ``data/.cache/``. Later loads memory-map those files, so
+processes share the pages instead of each re-parsing the CSV. The cache is
+keyed on the CSV's SHA-256 and is rebuilt automatically when it changes; when
+it can't be written (a read-only data/), the CSV is parsed on every load:
+
+    from cardiocare.dataset import load_frame
+    df = load_frame("cardio_train")
+
+``python -m cardiocare.dataset`` (re)builds every cache and reports timings.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from cardiocare.metrics import span
+from cardiocare.models import MODELS_DIR, file_sha256
+
+FORMAT_VERSION = 1
+DATA_DIR = os.path.join(os.path.dirname(MODELS_DIR), "data")
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+
+_CATEGORICAL = {'cholesterol': 'int8', 'gluc': 'int8', 'smoke': 'int8', 'alco': 'int8',
+                'active': 'int8', 'cardio': 'int8'}
+_MEASURES = {'id': 'int32', 'age': 'int32', 'height': 'int16', 'weight': 'float32',
+             'ap_hi': 'int16', 'ap_lo': 'int16'}
+
+# name -> CSV file, separator, columns to drop, column dtypes, string categories
+DATASETS = {
+    "cardio_train": {
+        "file": "cardio_train.csv",
+        "sep": ";",
+        "drop": [],
+        "dtypes": {**_MEASURES, 'gender': 'int8', **_CATEGORICAL},
+        "categories": {},
+    },
+    "cardio_preprocessed": {
+        "file": "cardio_preprocessed.csv",
+        "sep": ",",
+        # Index written by df.to_csv() in cardio_train.ipynb
+        "drop": ["Unnamed: 0"],
+        "dtypes": {**_MEASURES, **_CATEGORICAL, 'age_years': 'int8'},
+        "categories": {'gender': ['Female', 'Male']},
+    },
+}
+
+
+def _narrow(values, dtype):
+    """Cast to ``dtype`` when every value fits, otherwise keep the parsed dtype"""
+    target = np.dtype(dtype)
+    if target.kind in "iu":
+        info = np.iinfo(target)
+        if values.dtype.kind not in "iu" or (len(values) and (values.min() < info.min or values.max() > info.max)):
+            return values
+    return values.astype(target)
+
+
+def _source_sha256(source, cache_dir):
+    """SHA-256 of the CSV, rehashed only when its size or mtime changed"""
+    stat = os.stat(source)
+    pointer = os.path.join(cache_dir, os.path.basename(source) + ".source.json")
+    try:
+        with open(pointer) as f:
+            known = json.load(f)
+        if known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    sha256 = file_sha256(source)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{pointer}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}, f)
+    os.replace(tmp, pointer)
+    return sha256
+
+
+def _parse(name, source):
+    """Typed columns of ``source`` and their manifest, in the cache's layout"""
+    spec = DATASETS[name]
+    df = pd.read_csv(source, sep=spec["sep"])
+    df = df.drop(columns=[c for c in spec["drop"] if c in df.columns])
+
+    arrays, columns = {}, []
+    for col in df.columns:
+        if col in spec["categories"]:
+            categories = spec["categories"][col]
+            values = pd.Categorical(df[col], categories=categories).codes.astype(np.int8)
+        else:
+            categories = None
+            values = _narrow(df[col].to_numpy(), spec["dtypes"].get(col, df[col].dtype))
+        arrays[col] = values
+        columns.append({"name": col, "dtype": values.dtype.str, "categories": categories})
+    return arrays, {"format_version": FORMAT_VERSION, "dataset": name, "rows": len(df), "columns": columns}
+
+
+def build_cache(name, source, target):
+    """Parse ``source`` once and write its typed columns into ``target``"""
+    arrays, manifest = _parse(name, source)
+
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(tmp, exist_ok=True)
+        for col, values in arrays.items():
+            np.save(os.path.join(tmp, f"{col}.npy"), values)
+        with open(os.path.join(tmp, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    try:
+        os.rename(tmp, target)
+    except OSError:
+        # Another process finished the same build first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def cache_path(name, data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """Directory holding the current cache of ``name``, building it if needed"""
+    source = os.path.join(data_dir, DATASETS[name]["file"])
+    sha256 = _source_sha256(source, cache_dir)
+    target = os.path.join(cache_dir, f"{name}-v{FORMAT_VERSION}-{sha256[:16]}")
+    if not os.path.exists(os.path.join(target, "manifest.json")):
+        build_cache(name, source, target)
+        # Drop caches of older versions of the same CSV, but not other processes' builds in progress
+        for entry in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, entry)
+            if (entry.startswith(f"{name}-") and not entry.endswith(".tmp")
+                    and path != target and os.path.isdir(path)):
+                shutil.rmtree(path, ignore_errors=True)
+    return target
+
+
+def load_columns(name, data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """
+    Read-only memory-mapped arrays keyed by column (categoricals as int8
+    codes); parsed from the CSV in memory when the cache can't be written
+    """
+    try:
+        path = cache_path(name, data_dir, cache_dir)
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+    except OSError:
+        # Read-only data directory
+        return _parse(name, os.path.join(data_dir, DATASETS[name]["file"]))
+    return {col["name"]: np.load(os.path.join(path, f"{col['name']}.npy"), mmap_mode="r")
+            for col in manifest["columns"]}, manifest
+
+
+def load_frame(name, data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """
+    DataFrame of a dataset with compact dtypes; string columns come back as
+    Categorical. Other columns are read-only views of the memory-mapped
+    cache, so copy() the frame before writing into it in place
+    """
+    with span("load.frame"):
+        columns, manifest = load_columns(name, data_dir, cache_dir)
+        data = {}
+        for col in manifest["columns"]:
+            values = columns[col["name"]]
+            if col["categories"] is not None:
+                data[col["name"]] = pd.Categorical.from_codes(values, categories=col["categories"])
+            else:
+                data[col["name"]] = values
+        # One block per column over the memory maps, rather than consolidated private copies
+        return pd.DataFrame(data, copy=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the columnar dataset cache and report load times")
+    parser.add_argument("names", nargs="*", default=list(DATASETS))
+    args = parser.parse_args(argv)
+
+    for name in args.names:
+        spec = DATASETS[name]
+        start = time.perf_counter()
+        csv = pd.read_csv(os.path.join(DATA_DIR, spec["file"]), sep=spec["sep"])
+        csv_ms = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        path = cache_path(name)
+        build_ms = (time.perf_counter() - start) * 1e3
+        start = time.perf_counter()
+        df = load_frame(name)
+        load_ms = (time.perf_counter() - start) * 1e3
+
+        print(f"{name}: {len(df):,} rows -> {path}")
+        print(f"  read_csv {csv_ms:.0f} ms, {csv.memory_usage(deep=True).sum() / 2**20:.1f} MiB | "
+              f"cache check/build {build_ms:.0f} ms | "
+              f"load {load_ms:.1f} ms, {df.memory_usage(deep=True).sum() / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
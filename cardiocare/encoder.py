@@ -0,0 +1,148 @@
+"""
+Vectorized feature encoding for the Random Forest.
+
+Turns raw patient records into the model matrix in one pass, writing
+straight into a float32 array ordered by ``feature_columns``. Accepts the
+Predict Risk form vocabulary (``gender="Male"``, ``cholesterol="normal"``),
+the raw ``cardio_train.csv`` layout (age in days, gender 1/2) and the
+``cardio_preprocessed.csv`` layout, and reproduces the preprocessing done in
+the notebooks (``int(age / 365)``, integer weight, gender one-hot).
+"""
+
+import numpy as np
+import pandas as pd
+
+from cardiocare.metrics import span
+
+# Numeric columns scaled by scaler.pkl (same order as the notebook)
+NUM_COLS = ['height', 'weight', 'ap_hi', 'ap_lo', 'age_years']
+CATEGORICAL_COLS = ['cholesterol', 'gluc', 'smoke', 'alco', 'active']
+
+# Fields of one patient record, as collected by the heart_form form
+INPUT_FIELDS = ['age_years', 'gender', 'height', 'weight', 'ap_hi', 'ap_lo',
+                'cholesterol', 'gluc', 'smoke', 'alco', 'active']
+
+# cardio_train.csv convention: 1=Female, 2=Male
+RAW_GENDER = {1: "Female", 2: "Male"}
+
+
+def _lookup(values, mapping, name):
+    """Map labels to codes; numeric input is assumed to be already encoded"""
+    values = np.asarray(values)
+    if values.dtype.kind in "biuf":
+        return values.astype(np.float64)
+    uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+    try:
+        codes = np.array([mapping[u] for u in uniques], dtype=np.float64)
+    except KeyError as e:
+        raise ValueError(f"Unknown {name} value: {e.args[0]!r}") from None
+    return codes[inverse.reshape(-1)]
+
+
+class FeatureEncoder:
+    """Encode raw patient data into the feature matrix expected by the model"""
+
+    def __init__(self, feature_columns, mappings, scaler):
+        self.feature_columns = list(feature_columns)
+        self.mappings = mappings
+        self.n_features = len(self.feature_columns)
+
+        # Scaler statistics, keyed by column name; no scaler leaves features unscaled
+        self.scaling = {}
+        if scaler is not None:
+            scaler_cols = list(getattr(scaler, "feature_names_in_", NUM_COLS))
+            mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(len(scaler_cols))
+            scale = scaler.scale_ if scaler.scale_ is not None else np.ones(len(scaler_cols))
+            self.scaling = {col: (float(m), float(s)) for col, m, s in zip(scaler_cols, mean, scale)}
+
+        # One-hot gender columns, e.g. {"gender_Male": {"Male": 1, "Female": 0}}
+        self.gender_columns = {}
+        for label, onehot in mappings["gender"].items():
+            for col, value in onehot.items():
+                self.gender_columns.setdefault(col, {})[label] = value
+
+    def __len__(self):
+        return self.n_features
+
+    def raw_features(self, data):
+        """Unscaled feature columns (float64) keyed by feature name"""
+        columns = data.columns if isinstance(data, pd.DataFrame) else data.keys()
+
+        def column(name):
+            values = data[name]
+            return values.to_numpy() if isinstance(values, pd.Series) else np.asarray(values)
+
+        features = {}
+        if "age_years" in columns:
+            features["age_years"] = column("age_years").astype(np.float64)
+        else:
+            # Age in days, truncated to whole years like the notebook
+            features["age_years"] = (column("age") / 365).astype(np.int64).astype(np.float64)
+
+        for col in ['height', 'ap_hi', 'ap_lo']:
+            features[col] = column(col).astype(np.float64)
+        # The model was trained on integer weights
+        features["weight"] = np.trunc(column("weight").astype(np.float64))
+
+        for col in CATEGORICAL_COLS:
+            features[col] = _lookup(column(col), self.mappings[col], col)
+
+        gender = column("gender")
+        if gender.dtype.kind in "biuf":
+            unknown = ~np.isin(gender, list(RAW_GENDER))
+            if unknown.any():
+                raise ValueError(f"Unknown gender code: {gender[unknown][0]!r}")
+            gender = np.where(gender == 2, RAW_GENDER[2], RAW_GENDER[1])
+        for col, mapping in self.gender_columns.items():
+            features[col] = _lookup(gender, mapping, "gender")
+
+        return features
+
+    def encode_column(self, col, values):
+        """Model values of feature ``col`` (not a gender column) for raw values of that field"""
+        if col in CATEGORICAL_COLS:
+            values = _lookup(values, self.mappings[col], col)
+        else:
+            values = np.asarray(values, dtype=np.float64)
+            if col == "weight":
+                values = np.trunc(values)
+        if col in self.scaling:
+            mean, scale = self.scaling[col]
+            values = (values - mean) / scale
+        return values
+
+    def encode(self, data, out=None):
+        """
+        Encode a DataFrame (or mapping of column name -> values) into the
+        model matrix. Rows are written into ``out`` when it is given.
+        """
+        with span("predict.encode"):
+            features = self.raw_features(data)
+        return self.encode_features(features, out=out)
+
+    def encode_features(self, features, out=None):
+        """Scale and order the output of ``raw_features`` into the model matrix"""
+        n_rows = len(features["age_years"])
+        if out is None:
+            out = np.empty((n_rows, self.n_features), dtype=np.float32)
+        elif out.shape != (n_rows, self.n_features):
+            raise ValueError(f"Output buffer has shape {out.shape}, expected {(n_rows, self.n_features)}")
+
+        # The scaler.transform step
+        with span("predict.scale"):
+            for j, col in enumerate(self.feature_columns):
+                values = features[col]
+                if col in self.scaling:
+                    mean, scale = self.scaling[col]
+                    values = (values - mean) / scale
+                out[:, j] = values
+        return out
+
+    def encode_records(self, records, out=None):
+        """Encode a list of form-style records (dicts keyed by INPUT_FIELDS)"""
+        columns = {field: [record[field] for record in records] for field in INPUT_FIELDS}
+        return self.encode(columns, out=out)
+
+    def to_frame(self, X):
+        """Wrap an encoded matrix with feature names (no copy) for sklearn"""
+        return pd.DataFrame(X, columns=self.feature_columns, copy=False)
@@ -0,0 +1,154 @@
+"""
+Offline evaluation build for the "📈 Model Analysis" page.
+
+Scores the held-out test split from ModelTraining.ipynb (20%,
+``random_state=42`` over cardio_preprocessed.csv, without the rows the
+data-quality checks in cardiocare.quality reject) once and stores accuracy,
+precision, recall, F1, ROC/AUC, the confusion matrix, feature importances,
+risk band counts and the dataset correlation matrix in
+``models/evaluation.json``, on the calibrated probabilities and at the
+decision threshold of the model's calibration when it has one (see
+cardiocare.calibration). The calibration is fitted on half of the test
+split, so it is then evaluated on the other half only. The page only loads and renders this file:
+
+    python -m cardiocare.evaluation
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from cardiocare.calibration import load_calibration, split_halves
+from cardiocare.dataset import DATA_DIR, load_frame
+from cardiocare.health import RISK_BANDS, risk_bands
+from cardiocare.models import MODELS_DIR, load_models, model_version
+
+FORMAT_VERSION = 1
+EVALUATION_FILE = "evaluation.json"
+
+# Train/test split used by ModelTraining.ipynb
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+# Points kept from the ROC curve; plenty for a small chart
+MAX_ROC_POINTS = 256
+
+
+def split_indices(n_rows, test_size=TEST_SIZE, random_state=RANDOM_STATE, keep=None):
+    """
+    (train, test) row positions of the notebook's train_test_split. Rows
+    outside the ``keep`` mask are dropped from both sides afterwards, so the
+    split itself stays the one every earlier model was trained on.
+    """
+    from sklearn.model_selection import train_test_split
+    train_idx, test_idx = train_test_split(np.arange(n_rows), test_size=test_size, random_state=random_state)
+    if keep is not None:
+        train_idx, test_idx = train_idx[keep[train_idx]], test_idx[keep[test_idx]]
+    return train_idx, test_idx
+
+
+def _thin(fpr, tpr, max_points=MAX_ROC_POINTS):
+    if len(fpr) <= max_points:
+        return fpr, tpr
+    keep = np.unique(np.linspace(0, len(fpr) - 1, max_points).round().astype(int))
+    return fpr[keep], tpr[keep]
+
+
+def build_evaluation(model, scaler, feature_columns, mappings, data_dir=DATA_DIR, calibration=None):
+    """Compute every Model Analysis figure's data on the held-out split"""
+    from sklearn.metrics import (accuracy_score, confusion_matrix, f1_score, precision_score,
+                                 recall_score, roc_auc_score, roc_curve)
+    from cardiocare.quality import QualityFilter
+    from cardiocare.scoring import Scorer
+
+    scorer = Scorer(model, scaler, feature_columns, mappings, calibration=calibration)
+    df = load_frame("cardio_preprocessed", data_dir)
+    quality = QualityFilter()
+    _, test_idx = split_indices(len(df), keep=quality.check(df)[0])
+    if calibration is not None:
+        # Rows the calibration was fitted on would flatter the calibrated metrics
+        test_idx = np.sort(split_halves(test_idx)[1])
+    test = df.iloc[test_idx]
+
+    y_true = test['cardio'].to_numpy()
+    y_prob = scorer.score(scorer.encoder.encode(test))
+    y_pred = (y_prob >= scorer.decision_threshold).astype(int)
+    fpr, tpr, _ = roc_curve(y_true, y_prob)
+    fpr, tpr = _thin(fpr, tpr)
+
+    corr = load_frame("cardio_train", data_dir).corr()
+
+    evaluation = {
+        'n_test': int(len(test)),
+        'quality': quality.stats(),
+        'threshold': scorer.decision_threshold,
+        'calibration': calibration.describe() if calibration is not None else None,
+        'metrics': {
+            'accuracy': float(accuracy_score(y_true, y_pred)),
+            'precision': float(precision_score(y_true, y_pred)),
+            'recall': float(recall_score(y_true, y_pred)),
+            'f1': float(f1_score(y_true, y_pred)),
+            'roc_auc': float(roc_auc_score(y_true, y_prob)),
+        },
+        'confusion_matrix': confusion_matrix(y_true, y_pred).tolist(),
+        'roc_curve': {'fpr': fpr.tolist(), 'tpr': tpr.tolist()},
+        'risk_bands': dict(zip(RISK_BANDS, np.bincount(risk_bands(y_prob), minlength=len(RISK_BANDS)).tolist())),
+        'correlation': {'columns': list(corr.columns), 'values': corr.round(4).values.tolist()},
+    }
+    if hasattr(model, 'feature_importances_'):
+        evaluation['feature_importances'] = dict(zip(feature_columns, map(float, model.feature_importances_)))
+    return evaluation
+
+
+def write_evaluation(evaluation, path):
+    """Write JSON atomically so readers never see a half-written file"""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(evaluation, f)
+    os.replace(tmp, path)
+
+
+def load_evaluation(models_dir=MODELS_DIR, expected_version=None):
+    """Stored evaluation, or None when missing, from another format or another model"""
+    try:
+        with open(os.path.join(models_dir, EVALUATION_FILE)) as f:
+            evaluation = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if evaluation.get('format_version') != FORMAT_VERSION:
+        return None
+    if expected_version is not None and evaluation.get('model_version') != expected_version:
+        return None
+    return evaluation
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build models/evaluation.json for the Model Analysis page")
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    calibration = load_calibration(args.models_dir, expected_version=model_version(args.models_dir))
+    evaluation = build_evaluation(*load_models(args.models_dir), data_dir=args.data_dir, calibration=calibration)
+    evaluation.update({
+        'format_version': FORMAT_VERSION,
+        'model_version': model_version(args.models_dir),
+        'created': datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    })
+    path = os.path.join(args.models_dir, EVALUATION_FILE)
+    write_evaluation(evaluation, path)
+
+    metrics = evaluation['metrics']
+    print(f"Wrote {path} in {time.perf_counter() - start:.1f}s: "
+          f"accuracy {metrics['accuracy']:.2%}, AUC {metrics['roc_auc']:.3f} "
+          f"on {evaluation['n_test']:,} test rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Render cache for matplotlib/seaborn charts.
+
+Each chart is rendered once per key (chart name, data version, figure
+size, theme) into PNG/SVG bytes that are kept in a bounded LRU. The
+matplotlib figure is closed right after rendering, so figures no longer
+accumulate across Streamlit reruns and sessions.
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+
+from cardiocare.metrics import span
+
+# st.pyplot's own savefig settings, so cached images look the same
+SAVEFIG_KWARGS = {"bbox_inches": "tight", "dpi": 200}
+
+
+def figure_key(*parts):
+    """Stable hash of everything a chart depends on"""
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+class FigureCache:
+    """Thread-safe LRU of rendered chart bytes, bounded by entries and total size"""
+
+    def __init__(self, max_entries=64, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        # pyplot keeps global state and is not thread-safe; render one at a time
+        self._render_lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def _get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return data
+
+    def _put(self, key, data):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = data
+            self._size += len(data)
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def render(self, key, build, fmt="png"):
+        """Bytes of the chart for ``key``; ``build()`` returns a Figure and runs only on a miss"""
+        key = (key, fmt)
+        data = self._get(key)
+        if data is not None:
+            return data
+
+        with self._render_lock:
+            # Another session may have rendered it while we waited
+            data = self._get(key)
+            if data is not None:
+                return data
+            self.misses += 1
+            with span("render.figure"):
+                fig = build()
+                try:
+                    buffer = io.BytesIO()
+                    fig.savefig(buffer, format=fmt, **SAVEFIG_KWARGS)
+                    data = buffer.getvalue()
+                finally:
+                    plt.close(fig)
+        self._put(key, data)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,206 @@
+"""
+Flat-array inference engine for the Random Forest in rf_model.pkl.
+
+Every fitted tree is copied once into contiguous NumPy arrays (feature,
+threshold, children, node values) so a batch can walk all trees at the same
+time without sklearn's per-call validation. Results match
+``RandomForestClassifier.predict_proba`` to float tolerance.
+
+The walk is vectorized NumPy, so it wins on the single-row and small-batch
+path where sklearn's validation and DataFrame handling dominate. Larger
+batches are walked in row blocks; a pickled model scores them through
+sklearn's compiled tree code instead, which is about 4x faster there, but
+a model loaded from the artifact has only the flat arrays and is scored
+by the walk at every batch size. Leaf values are added one tree at a time,
+in tree order, as sklearn does, so both paths give identical results.
+
+``contributions`` follows the same paths and splits each prediction into a
+per-feature sum of node value changes (Saabas tree-path attribution).
+"""
+
+import os
+
+import numpy as np
+
+# Rows x trees walked per block; keeps the working set cache-sized
+BLOCK_SIZE = 1 << 18
+
+# Set CARDIOCARE_FLAT_FOREST=0 to always score through sklearn
+ENABLED = os.environ.get("CARDIOCARE_FLAT_FOREST", "1") != "0"
+
+
+class FlatForest:
+    """A tree ensemble flattened into contiguous node arrays"""
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes,
+                 n_features, feature_importances=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        # Class probabilities of every node, shape (n_nodes, n_classes)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = int(n_features)
+        self.n_estimators = len(self.roots)
+        # Leaves point at themselves, so a finished walk stays put
+        self.is_leaf = self.left == np.arange(len(self.left))
+        # Interleaved (left, right) pairs: child = children[2 * node + went_right]
+        self.children = np.column_stack([self.left, self.right]).ravel()
+        if feature_importances is not None:
+            self.feature_importances_ = np.asarray(feature_importances)
+
+    @classmethod
+    def from_estimator(cls, model):
+        """Flatten a fitted RandomForestClassifier (or any forest of DecisionTreeClassifiers)"""
+        trees = [est.tree_ for est in model.estimators_]
+        sizes = [tree.node_count for tree in trees]
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+
+        feature, threshold, left, right, value = [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            nodes = np.arange(tree.node_count) + offset
+            leaf = tree.children_left == -1
+            feature.append(np.where(leaf, 0, tree.feature))
+            threshold.append(np.where(leaf, np.inf, tree.threshold))
+            left.append(np.where(leaf, nodes, tree.children_left + offset))
+            right.append(np.where(leaf, nodes, tree.children_right + offset))
+            counts = tree.value[:, 0, :]
+            value.append(counts / counts.sum(axis=1, keepdims=True))
+
+        return cls(
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold),
+            left=np.concatenate(left),
+            right=np.concatenate(right),
+            value=np.concatenate(value),
+            roots=offsets,
+            classes=model.classes_,
+            n_features=model.n_features_in_,
+            feature_importances=getattr(model, "feature_importances_", None),
+        )
+
+    def arrays(self):
+        """The node arrays inference needs, e.g. to place in shared memory"""
+        return {'feature': self.feature, 'threshold': self.threshold, 'children': self.children,
+                'is_leaf': self.is_leaf, 'value': self.value, 'roots': self.roots}
+
+    @classmethod
+    def from_arrays(cls, arrays, classes, n_features):
+        """FlatForest over existing ``arrays()`` without copying them (e.g. shared memory views)"""
+        forest = cls.__new__(cls)
+        forest.__dict__.update(arrays)
+        forest.left, forest.right = arrays['children'][0::2], arrays['children'][1::2]
+        forest.classes_ = np.asarray(classes)
+        forest.n_features_in_ = int(n_features)
+        forest.n_estimators = len(forest.roots)
+        return forest
+
+    def _as_matrix(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected an (n, {self.n_features_in_}) matrix, got shape {X.shape}")
+        return X
+
+    def _apply_block(self, X, roots):
+        """Leaf index reached in each tree of ``roots`` by each row of X"""
+        n_rows, n_trees = len(X), len(roots)
+        # Pairs are laid out tree-major so neighbours walk the same tree
+        node = np.repeat(roots, n_rows)
+        # Offset of each (tree, row) pair's row inside the flattened X
+        row_start = np.tile(np.arange(n_rows, dtype=np.int32) * X.shape[1], n_trees)
+        x = X.ravel()
+
+        # Pairs still walking, with their current node and row offset
+        pos = np.flatnonzero(~self.is_leaf[node])
+        current, start = node[pos], row_start[pos]
+        while pos.size:
+            # Walk one level; leaves loop back onto themselves
+            went_right = x[start + self.feature[current]] > self.threshold[current]
+            current = self.children[2 * current + went_right]
+            # Drop finished pairs once a quarter of them have reached a leaf
+            done = self.is_leaf[current]
+            n_done = np.count_nonzero(done)
+            if 4 * n_done >= pos.size:
+                node[pos[done]] = current[done]
+                walking = ~done
+                pos, current, start = pos[walking], current[walking], start[walking]
+        return node.reshape(n_trees, n_rows).T
+
+    def _row_blocks(self, n_rows):
+        step = max(1, BLOCK_SIZE // max(1, self.n_estimators))
+        for start in range(0, n_rows, step):
+            yield slice(start, min(start + step, n_rows))
+
+    def apply(self, X):
+        """Global leaf index for every (row, tree), shape (n, n_estimators)"""
+        X = self._as_matrix(X)
+        out = np.empty((len(X), self.n_estimators), dtype=np.intp)
+        for rows in self._row_blocks(len(X)):
+            out[rows] = self._apply_block(X[rows], self.roots)
+        return out
+
+    def _leaf_sum(self, leaves):
+        """Leaf values of ``leaves`` (trees, rows) added one tree at a time, in tree order"""
+        out = np.zeros((leaves.shape[1], len(self.classes_)))
+        for tree_leaves in leaves:
+            out += self.value[tree_leaves]
+        return out
+
+    def predict_proba(self, X):
+        """Mean class probabilities over all trees, like sklearn"""
+        X = self._as_matrix(X)
+        proba = np.empty((len(X), len(self.classes_)), dtype=np.float64)
+        for rows in self._row_blocks(len(X)):
+            proba[rows] = self._leaf_sum(self._apply_block(X[rows], self.roots).T) / self.n_estimators
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def _contributions_block(self, X, value):
+        """Sum over trees of each split's change in ``value``, per (row, split feature)"""
+        n_rows, n_features = X.shape
+        current = np.repeat(self.roots, n_rows)
+        row_start = np.tile(np.arange(n_rows, dtype=np.intp) * n_features, len(self.roots))
+        x = X.ravel()
+        totals = np.zeros(n_rows * n_features)
+
+        walking = ~self.is_leaf[current]
+        current, row_start = current[walking], row_start[walking]
+        while current.size:
+            cell = row_start + self.feature[current]
+            went_right = x[cell] > self.threshold[current]
+            child = self.children[2 * current + went_right]
+            totals += np.bincount(cell, weights=value[child] - value[current], minlength=totals.size)
+            walking = ~self.is_leaf[child]
+            current, row_start = child[walking], row_start[walking]
+        return totals.reshape(n_rows, n_features)
+
+    def contributions(self, X, class_index=1):
+        """
+        Tree-path (Saabas) attributions for one class: ``(bias, contributions)``
+        with ``bias + contributions.sum(axis=1) == predict_proba(X)[:, class_index]``.
+        ``bias`` is the forest's mean root value (the training prior).
+        """
+        X = self._as_matrix(X)
+        value = self.value[:, class_index]
+        out = np.empty((len(X), self.n_features_in_), dtype=np.float64)
+        for rows in self._row_blocks(len(X)):
+            out[rows] = self._contributions_block(X[rows], value)
+        return float(value[self.roots].mean()), out / self.n_estimators
+
+
+def compile_forest(model):
+    """FlatForest for a fitted forest, or None when flattening is disabled or unsupported"""
+    if isinstance(model, FlatForest):
+        # Loaded from the pickle-free artifact: already flat
+        return model
+    if not ENABLED or not hasattr(model, "estimators_"):
+        return None
+    try:
+        return FlatForest.from_estimator(model)
+    except AttributeError:
+        # Not a forest of sklearn decision trees (e.g. boosting stages)
+        return None
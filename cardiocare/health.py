@@ -0,0 +1,141 @@
+"""Derived health metrics shown next to every prediction."""
+
+import numpy as np
+
+from cardiocare.metrics import span
+
+
+def calculate_bmi(height_cm, weight_kg):
+    """Calculate BMI"""
+    height_m = height_cm / 100
+    return weight_kg / (height_m ** 2)
+
+def get_bmi_category(bmi):
+    """Get BMI category"""
+    if bmi < 18.5:
+        return "Underweight"
+    elif bmi < 25:
+        return "Normal"
+    elif bmi < 30:
+        return "Overweight"
+    else:
+        return "Obese"
+
+def get_blood_pressure_category(systolic, diastolic):
+    """Get BP category"""
+    if systolic < 120 and diastolic < 80:
+        return "Normal"
+    elif systolic < 130 and diastolic < 80:
+        return "Elevated"
+    elif systolic < 140 or diastolic < 90:
+        return "Hypertension Stage 1"
+    elif systolic >= 140 or diastolic >= 90:
+        return "Hypertension Stage 2"
+    else:
+        return "Hypertensive Crisis"
+
+# Probability bands for the prediction history and dashboard. They are
+# fixed, not tied to the calibrated decision threshold (see
+# cardiocare.calibration), because each stored prediction keeps its band
+RISK_BANDS = ["Low", "Medium", "High"]
+RISK_BAND_CUTOFFS = [0.4, 0.6]
+
+def get_risk_band(probability):
+    """Get risk band"""
+    if probability < RISK_BAND_CUTOFFS[0]:
+        return "Low"
+    elif probability < RISK_BAND_CUTOFFS[1]:
+        return "Medium"
+    else:
+        return "High"
+
+# Risk factors counted on the Health Dashboard
+RISK_FACTORS = ['High BP', 'Cholesterol', 'Smoking', 'Obesity', 'Diabetes', 'Inactivity']
+
+def get_risk_factors(record, bmi):
+    """Dashboard risk factors present in one form record"""
+    present = [
+        record['ap_hi'] > 140 or record['ap_lo'] > 90,
+        record['cholesterol'] != "normal",
+        record['smoke'] == "yes",
+        bmi >= 30,
+        record['gluc'] != "normal",
+        record['active'] == "no",
+    ]
+    return [name for name, flag in zip(RISK_FACTORS, present) if flag]
+
+def count_risk_factors(record, bmi):
+    """Count (lifestyle, medical) risk factors out of 3 each"""
+    lifestyle_risk = 0
+    if record['age_years'] > 50: lifestyle_risk += 1
+    if bmi > 25: lifestyle_risk += 1
+    if record['smoke'] == "yes": lifestyle_risk += 1
+
+    medical_risk = 0
+    if record['cholesterol'] != "normal": medical_risk += 1
+    if record['gluc'] != "normal": medical_risk += 1
+    if record['ap_hi'] > 140 or record['ap_lo'] > 90: medical_risk += 1
+
+    return lifestyle_risk, medical_risk
+
+def summarize(record, probability, threshold=0.5):
+    """Prediction plus the derived metrics reported for one patient record"""
+    with span("predict.derive"):
+        bmi = calculate_bmi(record['height'], record['weight'])
+        lifestyle_risk, medical_risk = count_risk_factors(record, bmi)
+        return {
+            'probability': probability,
+            'prediction': int(probability >= threshold),
+            'bmi': bmi,
+            'bmi_category': get_bmi_category(bmi),
+            'bp_category': get_blood_pressure_category(record['ap_hi'], record['ap_lo']),
+            'lifestyle_risk': lifestyle_risk,
+            'medical_risk': medical_risk,
+            'total_risk': lifestyle_risk + medical_risk
+        }
+
+
+# -----------------------------
+# Vectorized versions for bulk scoring
+# -----------------------------
+BMI_CATEGORIES = ["Underweight", "Normal", "Overweight", "Obese"]
+BP_CATEGORIES = ["Normal", "Elevated", "Hypertension Stage 1", "Hypertension Stage 2"]
+
+def bmi_categories(bmi):
+    """get_bmi_category over an array"""
+    return np.asarray(BMI_CATEGORIES, dtype=object)[np.searchsorted([18.5, 25, 30], bmi, side="right")]
+
+def blood_pressure_categories(systolic, diastolic):
+    """get_blood_pressure_category over arrays (same rule order)"""
+    systolic, diastolic = np.asarray(systolic), np.asarray(diastolic)
+    conditions = [
+        (systolic < 120) & (diastolic < 80),
+        (systolic < 130) & (diastolic < 80),
+        (systolic < 140) | (diastolic < 90),
+    ]
+    return np.select(conditions, BP_CATEGORIES[:3], default=BP_CATEGORIES[3]).astype(object)
+
+def risk_bands(probability):
+    """get_risk_band over an array, as indices into RISK_BANDS"""
+    return np.searchsorted(RISK_BAND_CUTOFFS, probability, side="right")
+
+def risk_factor_matrix(features, bmi, mappings):
+    """get_risk_factors over raw feature columns: boolean (rows, RISK_FACTORS)"""
+    return np.column_stack([
+        (features['ap_hi'] > 140) | (features['ap_lo'] > 90),
+        features['cholesterol'] != mappings['cholesterol']['normal'],
+        features['smoke'] == mappings['smoke']['yes'],
+        bmi >= 30,
+        features['gluc'] != mappings['gluc']['normal'],
+        features['active'] == mappings['active']['no'],
+    ])
+
+def count_risk_factors_array(features, bmi, mappings):
+    """count_risk_factors over encoder.raw_features() output (numeric codes)"""
+    lifestyle_risk = ((features['age_years'] > 50).astype(np.int8)
+                      + (bmi > 25)
+                      + (features['smoke'] == mappings['smoke']['yes']))
+    medical_risk = ((features['cholesterol'] != mappings['cholesterol']['normal']).astype(np.int8)
+                    + (features['gluc'] != mappings['gluc']['normal'])
+                    + ((features['ap_hi'] > 140) | (features['ap_lo'] > 90)))
+    return lifestyle_risk, medical_risk
@@ -0,0 +1,253 @@
+"""
+Persistent prediction history (audit log).
+
+Every prediction is appended to a local SQLite database in WAL mode with
+its inputs, model version and latency. ``log()`` only enqueues the row; a
+background thread writes queued rows in batches, one transaction each, so
+logging never waits on the disk in the prediction path. The same
+transaction adds the batch to the running dashboard counts (see
+cardiocare.aggregates). Queries open their own connection and can run while
+the writer is busy:
+
+    store = HistoryStore()
+    store.log(make_entry(record, result, model_version, latency_ms))
+    rows, total = store.query(page=0, risk_band="High")
+
+Confirmed outcomes are attached to logged predictions with ``label()``
+and feed incremental retraining (see cardiocare.incremental).
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+
+from cardiocare.aggregates import RiskAggregates
+from cardiocare.dataset import DATA_DIR
+from cardiocare.encoder import INPUT_FIELDS
+from cardiocare.health import get_risk_band
+
+HISTORY_DB = os.environ.get("CARDIOCARE_HISTORY_DB", os.path.join(DATA_DIR, "history.sqlite3"))
+
+# Rows written per transaction, and how long the writer waits to fill a batch
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5
+PAGE_SIZE = 25
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    patient_id TEXT,
+    source TEXT NOT NULL,
+    model_version TEXT,
+    probability REAL NOT NULL,
+    prediction INTEGER NOT NULL,
+    risk_band TEXT NOT NULL,
+    latency_ms REAL,
+    inputs TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS predictions_created ON predictions (created);
+CREATE INDEX IF NOT EXISTS predictions_band_created ON predictions (risk_band, created);
+CREATE INDEX IF NOT EXISTS predictions_patient_created ON predictions (patient_id, created);
+CREATE TABLE IF NOT EXISTS aggregates (
+    key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outcomes (
+    prediction_id INTEGER PRIMARY KEY REFERENCES predictions (id),
+    cardio INTEGER NOT NULL,
+    labelled REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outcomes_labelled ON outcomes (labelled);
+"""
+
+COLUMNS = ["created", "patient_id", "source", "model_version", "probability", "prediction",
+           "risk_band", "latency_ms", "inputs"]
+
+UPSERT_COUNT = ("INSERT INTO aggregates (key, count) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET count = count + excluded.count")
+
+# Outcome of one prediction, by its id or as the latest prediction for a patient
+LABEL_BY = {
+    'prediction_id': "SELECT id, ?, ? FROM predictions WHERE id = ?",
+    'patient_id': "SELECT id, ?, ? FROM predictions WHERE patient_id = ? ORDER BY created DESC, id DESC LIMIT 1",
+}
+UPSERT_OUTCOME = ("INSERT INTO outcomes (prediction_id, cardio, labelled) {select} "
+                  "ON CONFLICT (prediction_id) DO UPDATE SET cardio = excluded.cardio, labelled = excluded.labelled")
+
+
+def make_entry(record, result, model_version=None, latency_ms=None, patient_id=None, source="app"):
+    """History row for one scored form record and its ``summarize`` result"""
+    probability = float(result['probability'])
+    aggregates = RiskAggregates()
+    aggregates.add(record, probability)
+    return {
+        'created': time.time(),
+        'patient_id': patient_id or None,
+        'source': source,
+        'model_version': model_version,
+        'probability': probability,
+        'prediction': int(result['prediction']),
+        'risk_band': get_risk_band(probability),
+        'latency_ms': latency_ms,
+        'inputs': json.dumps({field: record[field] for field in INPUT_FIELDS}),
+        # Counter increments for the aggregates table
+        'counts': aggregates.to_counts(),
+    }
+
+
+def _connect(path, timeout=30.0):
+    connection = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+class HistoryStore:
+    """Append-only prediction log with a background batch writer"""
+
+    def __init__(self, path=HISTORY_DB, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = _connect(path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        self._backfill_aggregates(connection)
+        connection.close()
+
+        self._queue = queue.Queue()
+        self.written = 0
+        self._writer = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._writer.start()
+
+    @staticmethod
+    def _backfill_aggregates(connection):
+        """Count a log written before the aggregates table existed, once"""
+        with connection:
+            # Take the write lock before checking, so concurrently opening workers can't both backfill
+            connection.execute("BEGIN IMMEDIATE")
+            if connection.execute("SELECT 1 FROM aggregates LIMIT 1").fetchone():
+                return
+            aggregates = RiskAggregates()
+            for row in connection.execute("SELECT probability, inputs FROM predictions"):
+                aggregates.add(json.loads(row['inputs']), row['probability'])
+            if aggregates.total:
+                connection.executemany(UPSERT_COUNT, aggregates.to_counts().items())
+
+    def log(self, entry):
+        """Queue one ``make_entry`` row; returns immediately"""
+        self._queue.put(entry)
+
+    def _run(self):
+        connection = _connect(self.path)
+        # WAL makes NORMAL durable against application crashes; only an OS
+        # crash can lose the last transactions
+        connection.execute("PRAGMA synchronous=NORMAL")
+        insert = f"INSERT INTO predictions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            rows = [entry for entry in batch if entry is not None]
+            if rows:
+                counts = Counter()
+                for row in rows:
+                    counts.update(row['counts'])
+                try:
+                    with connection:
+                        connection.executemany(insert, [[row[c] for c in COLUMNS] for row in rows])
+                        connection.executemany(UPSERT_COUNT, counts.items())
+                    self.written += len(rows)
+                except sqlite3.Error as e:
+                    print(f"history: dropped {len(rows)} rows: {e}", file=sys.stderr)
+            for _ in batch:
+                self._queue.task_done()
+            if len(rows) < len(batch):
+                connection.close()
+                return
+
+    def flush(self):
+        """Block until every queued row is written"""
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join()
+
+    def query(self, page=0, page_size=PAGE_SIZE, risk_band=None, patient_id=None, since=None, until=None):
+        """One page of entries, newest first, and the total number matching the filters"""
+        conditions, params = [], []
+        if risk_band:
+            conditions.append("risk_band = ?")
+            params.append(risk_band)
+        if patient_id:
+            conditions.append("patient_id = ?")
+            params.append(patient_id)
+        if since is not None:
+            conditions.append("created >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("created < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        connection = _connect(self.path)
+        try:
+            total = connection.execute(f"SELECT COUNT(*) FROM predictions {where}", params).fetchone()[0]
+            rows = connection.execute(
+                f"SELECT id, {', '.join(COLUMNS)} FROM predictions {where} "
+                "ORDER BY created DESC, id DESC LIMIT ? OFFSET ?",
+                params + [page_size, page * page_size],
+            ).fetchall()
+        finally:
+            connection.close()
+        return [dict(row, inputs=json.loads(row['inputs'])) for row in rows], total
+
+    def label(self, outcomes, by="prediction_id"):
+        """
+        Record confirmed outcomes, ``(key, cardio)`` pairs keyed by prediction
+        id or patient id; returns how many matched a logged prediction
+        """
+        self.flush()
+        statement = UPSERT_OUTCOME.format(select=LABEL_BY[by])
+        now = time.time()
+        connection = _connect(self.path)
+        try:
+            with connection:
+                before = connection.total_changes
+                connection.executemany(statement, [(int(cardio), now, key) for key, cardio in outcomes])
+                return connection.total_changes - before
+        finally:
+            connection.close()
+
+    def labelled(self, since=0.0):
+        """Labelled predictions (id, inputs, cardio, labelled time) with labels newer than ``since``"""
+        connection = _connect(self.path)
+        try:
+            rows = connection.execute(
+                "SELECT p.id, p.inputs, o.cardio, o.labelled FROM outcomes o "
+                "JOIN predictions p ON p.id = o.prediction_id WHERE o.labelled > ? ORDER BY o.labelled, p.id",
+                (since,),
+            ).fetchall()
+        finally:
+            connection.close()
+        return [dict(row, inputs=json.loads(row['inputs'])) for row in rows]
+
+    def aggregates(self):
+        """Running risk factor and band counts over the whole log"""
+        connection = _connect(self.path)
+        try:
+            counts = dict(connection.execute("SELECT key, count FROM aggregates").fetchall())
+        finally:
+            connection.close()
+        return RiskAggregates.from_counts(counts)
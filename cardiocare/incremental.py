@@ -0,0 +1,300 @@
+"""
+Incremental retraining on labelled prediction history.
+
+Rather than rerunning the grid search over every row, an update takes the
+predictions whose outcomes were labelled since the last update (see
+``HistoryStore.label``) and
+
+  1. updates the StandardScaler's running mean/variance with them
+     (``partial_fit``),
+  2. moves the existing trees' split thresholds into the new scaling, so
+     every whole-number input still takes the same path,
+  3. grows ``--trees`` new trees on the new rows (warm start), and
+  4. replaces models/ only if the candidate's held-out AUC is no lower
+     than the current model's, on the notebook's test split plus the new
+     rows held out (every fifth prediction id, never trained on), and
+     then refits the probability calibration (see cardiocare.calibration)
+     and rebuilds any risk table or compact forest (see cardiocare.table
+     and cardiocare.compact) with the settings they were built with.
+
+Usage:
+
+    python -m cardiocare.incremental --labels outcomes.csv   # prediction_id or patient_id, cardio
+    python -m cardiocare.incremental --trees 20 --dry-run
+
+Each promoted update is appended to ``increments`` in models/manifest.json;
+its ``labelled_through`` marks where the next update starts.
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from cardiocare.dataset import DATA_DIR
+from cardiocare.encoder import FeatureEncoder
+from cardiocare.models import MODELS_DIR, load_pickles, model_version
+
+DEFAULT_TREES = 10
+MIN_ROWS = 100
+# Prediction ids divisible by this are held out for the promotion check
+HOLDOUT_EVERY = 5
+
+
+def _scaling(feature_columns, scaler):
+    """(mean, scale) per model feature; unscaled features get (0, 1)"""
+    stats = dict(zip(scaler.feature_names_in_, zip(scaler.mean_, scaler.scale_)))
+    mean, scale = zip(*(stats.get(col, (0.0, 1.0)) for col in feature_columns))
+    return np.array(mean), np.array(scale)
+
+
+def rescale_thresholds(model, feature_columns, old_scaler, new_scaler):
+    """
+    Move every tree's thresholds on scaled features from ``old_scaler``'s
+    scaling to ``new_scaler``'s, in place. All scaled inputs are whole
+    numbers, so each split keeps the same largest value going left, found
+    by encoding the neighbouring candidates as the model sees them (float32).
+    """
+    old_mean, old_scale = _scaling(feature_columns, old_scaler)
+    new_mean, new_scale = _scaling(feature_columns, new_scaler)
+    scaled = np.isin(feature_columns, list(new_scaler.feature_names_in_))
+
+    def encode(values, features, mean, scale):
+        return ((values - mean[features]) / scale[features]).astype(np.float32).astype(np.float64)
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        nodes = np.flatnonzero(tree.feature >= 0)
+        nodes = nodes[scaled[tree.feature[nodes]]]
+        if not len(nodes):
+            continue
+        features = tree.feature[nodes]
+        threshold = tree.threshold[nodes]
+        raw = np.floor(threshold * old_scale[features] + old_mean[features])
+        cutoff = raw - 1
+        for candidate in (raw, raw + 1):
+            cutoff = np.where(encode(candidate, features, old_mean, old_scale) <= threshold, candidate, cutoff)
+        # Halfway between the encodings of the cutoff and the next whole number
+        tree.threshold[nodes] = (encode(cutoff, features, new_mean, new_scale)
+                                 + encode(cutoff + 1, features, new_mean, new_scale)) / 2
+
+
+def labelled_frame(rows):
+    """Form-vocabulary DataFrame of labelled history rows, with ``prediction_id`` and ``cardio``"""
+    frame = pd.DataFrame([row['inputs'] for row in rows])
+    frame.insert(0, 'prediction_id', [row['id'] for row in rows])
+    frame['cardio'] = [row['cardio'] for row in rows]
+    return frame
+
+
+def feature_frame(encoder, frame, scaler):
+    """Model features of ``frame`` as a DataFrame, numeric columns scaled by ``scaler``"""
+    features = encoder.raw_features(frame)
+    X = pd.DataFrame({col: features[col] for col in encoder.feature_columns})
+    columns = list(scaler.feature_names_in_)
+    X[columns] = scaler.transform(X[columns])
+    return X
+
+
+def held_out_auc(model, scaler, feature_columns, mappings, frames):
+    """ROC AUC of the model on each held-out frame and on all of them together"""
+    from sklearn.metrics import roc_auc_score
+
+    encoder = FeatureEncoder(feature_columns, mappings, scaler)
+    y_true, y_prob, aucs = [], [], {}
+    for name, frame in frames.items():
+        if not len(frame):
+            continue
+        truth = frame['cardio'].to_numpy()
+        prob = model.predict_proba(feature_frame(encoder, frame, scaler))[:, 1]
+        y_true.append(truth)
+        y_prob.append(prob)
+        aucs[name] = float(roc_auc_score(truth, prob)) if len(np.unique(truth)) == 2 else None
+    aucs['all'] = float(roc_auc_score(np.concatenate(y_true), np.concatenate(y_prob)))
+    return aucs
+
+
+def _read_manifest(models_dir):
+    from cardiocare.training import MANIFEST_FILE
+
+    try:
+        with open(os.path.join(models_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def rebuild_derived(models_dir, data_dir, log):
+    """Rebuild the risk table and compact forest of the replaced model, with the settings they were built with"""
+    from cardiocare import compact, table
+
+    builds = {}
+    try:
+        with open(os.path.join(models_dir, table.TABLE_MANIFEST)) as f:
+            built = json.load(f)
+        limits = built.get('limits', {'max_error': table.MAX_ERROR, 'min_agreement': table.MIN_AGREEMENT})
+        builds[table.TABLE_FILE] = (table.main, ["--knots", json.dumps(built['knots']),
+                                                 "--max-error", str(limits['max_error']),
+                                                 "--min-agreement", str(limits['min_agreement'])])
+    except (OSError, ValueError, KeyError):
+        pass
+    try:
+        with open(os.path.join(models_dir, compact.COMPACT_MANIFEST)) as f:
+            built = json.load(f)
+        argv = ["--data-dir", data_dir, "--leaf-dtype", built['leaf_dtype']]
+        if built['trees'] != "all":
+            argv += ["--trees", str(len(built['trees']))]
+        builds[compact.COMPACT_FILE] = (compact.main, argv)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    for name, (build, argv) in builds.items():
+        if build(["--models-dir", models_dir] + argv) != 0:
+            log(f"{name} was not rebuilt and still holds the previous model; it refuses to load until rebuilt")
+
+
+def update(models_dir=MODELS_DIR, data_dir=DATA_DIR, history=None, n_trees=DEFAULT_TREES, min_rows=MIN_ROWS,
+           max_auc_drop=0.0, dry_run=False, evaluate=True, calibrate=True, rebuild=True, verbose=True):
+    """Grow the forest on newly labelled history; returns this update's record"""
+    from cardiocare.dataset import load_frame
+    from cardiocare.evaluation import split_indices
+    from cardiocare.quality import QualityFilter, clean_mask
+
+    def log(message):
+        if verbose:
+            print(message, file=sys.stderr)
+
+    manifest = _read_manifest(models_dir)
+    increments = manifest.get('increments', [])
+    since = increments[-1]['labelled_through'] if increments else 0.0
+    rows = history.labelled(since) if history is not None else []
+    record = {'created': datetime.now(timezone.utc).isoformat(timespec="seconds"),
+              'labelled_since': since, 'n_labelled': len(rows), 'promoted': False}
+    if len(rows) < min_rows:
+        log(f"{len(rows):,} newly labelled predictions, fewer than --min-rows {min_rows:,}; nothing to do")
+        return record
+
+    frame = labelled_frame(rows)
+    quality = QualityFilter()
+    keep, _ = quality.check(frame.drop(columns='prediction_id'))
+    frame = frame[keep]
+    holdout = (frame['prediction_id'] % HOLDOUT_EVERY == 0).to_numpy()
+    train, new_test = frame[~holdout], frame[holdout]
+    record.update({'labelled_through': rows[-1]['labelled'], 'quality': quality.stats(),
+                   'n_train': int(len(train)), 'n_holdout': int(len(new_test))})
+    if train['cardio'].nunique() < 2:
+        log("The newly labelled training rows hold a single outcome; waiting for more labels")
+        return record
+
+    model, scaler, feature_columns, mappings = load_pickles(models_dir)
+    encoder = FeatureEncoder(feature_columns, mappings, scaler)
+    df = load_frame("cardio_preprocessed", data_dir)
+    _, test_idx = split_indices(len(df), keep=clean_mask(df))
+    frames = {'test_split': df.iloc[test_idx], 'new_holdout': new_test}
+
+    start = time.perf_counter()
+    candidate_scaler = copy.deepcopy(scaler)
+    features = encoder.raw_features(train)
+    candidate_scaler.partial_fit(pd.DataFrame({col: features[col] for col in scaler.feature_names_in_}))
+    candidate = copy.deepcopy(model)
+    rescale_thresholds(candidate, feature_columns, scaler, candidate_scaler)
+    candidate.set_params(warm_start=True, n_estimators=model.n_estimators + n_trees, n_jobs=-1)
+    candidate.fit(feature_frame(encoder, train, candidate_scaler), train['cardio'].to_numpy())
+    candidate.set_params(warm_start=False, n_jobs=None)
+    record['fit_seconds'] = round(time.perf_counter() - start, 3)
+
+    before = held_out_auc(model, scaler, feature_columns, mappings, frames)
+    after = held_out_auc(candidate, candidate_scaler, feature_columns, mappings, frames)
+    record.update({'n_new_trees': n_trees, 'n_estimators': candidate.n_estimators,
+                   'auc_before': before, 'auc_after': after})
+    log(f"{len(train):,} rows -> {n_trees} new trees in {record['fit_seconds']:.1f}s; held-out AUC "
+        + ", ".join(f"{name} {before[name] or float('nan'):.4f} -> {after[name] or float('nan'):.4f}"
+                    for name in after))
+    if after['all'] < before['all'] - max_auc_drop:
+        log("Held-out AUC dropped; keeping the current model")
+        return record
+    if dry_run:
+        log("Dry run; models/ left unchanged")
+        return record
+
+    from cardiocare.artifact import write_artifact
+    from cardiocare.calibration import current_threshold
+    from cardiocare.training import export_artifacts
+
+    threshold = current_threshold(models_dir)
+    record['promoted'] = True
+    record['previous_model_version'] = model_version(models_dir, use_artifact=False)
+    manifest['increments'] = increments + [record]
+    manifest.pop('files', None)
+    export_artifacts(models_dir, {
+        "rf_model.pkl": candidate,
+        "scaler.pkl": candidate_scaler,
+        "feature_columns.pkl": feature_columns,
+        "mappings.pkl": mappings,
+    }, manifest)
+    write_artifact(models_dir, candidate, candidate_scaler, feature_columns, mappings,
+                   model_version(models_dir, use_artifact=False))
+    log(f"Promoted model {model_version(models_dir)} ({candidate.n_estimators} trees) to {models_dir}")
+    if calibrate:
+        from cardiocare import calibration
+        calibration.main(["--models-dir", models_dir, "--data-dir", data_dir, "--threshold", str(threshold)])
+    if rebuild:
+        rebuild_derived(models_dir, data_dir, log)
+    if evaluate:
+        from cardiocare import evaluation
+        evaluation.main(["--models-dir", models_dir, "--data-dir", data_dir])
+    return record
+
+
+def read_labels(path):
+    """(key column, [(key, cardio)]) from a CSV with cardio and prediction_id or patient_id"""
+    labels = pd.read_csv(path, dtype={'patient_id': str})
+    by = next((col for col in ('prediction_id', 'patient_id') if col in labels.columns), None)
+    if by is None or 'cardio' not in labels.columns:
+        raise ValueError(f"{path} needs a cardio column and a prediction_id or patient_id column")
+    if not labels['cardio'].isin([0, 1]).all():
+        raise ValueError(f"{path}: cardio must be 0 or 1")
+    keys = labels[by].astype(int if by == 'prediction_id' else str)
+    return by, list(zip(keys.tolist(), labels['cardio'].astype(int).tolist()))
+
+
+def main(argv=None):
+    from cardiocare.history import HISTORY_DB, HistoryStore
+
+    parser = argparse.ArgumentParser(description="Grow the forest on newly labelled prediction history")
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--history-db", default=HISTORY_DB)
+    parser.add_argument("--labels", help="CSV of outcomes to record first (prediction_id or patient_id, cardio)")
+    parser.add_argument("--trees", type=int, default=DEFAULT_TREES, help="new trees to grow")
+    parser.add_argument("--min-rows", type=int, default=MIN_ROWS, help="labelled rows needed for an update")
+    parser.add_argument("--max-auc-drop", type=float, default=0.0, help="held-out AUC the update may lose")
+    parser.add_argument("--dry-run", action="store_true", help="report without replacing models/")
+    parser.add_argument("--no-evaluation", action="store_true", help="skip rebuilding models/evaluation.json")
+    parser.add_argument("--no-calibration", action="store_true", help="skip refitting the probability calibration")
+    parser.add_argument("--no-rebuild", action="store_true",
+                        help="leave the risk table and compact forest of the old model (they then refuse to load)")
+    args = parser.parse_args(argv)
+
+    history = HistoryStore(args.history_db)
+    try:
+        if args.labels:
+            by, outcomes = read_labels(args.labels)
+            matched = history.label(outcomes, by=by)
+            print(f"Recorded {matched:,} of {len(outcomes):,} outcomes", file=sys.stderr)
+        record = update(args.models_dir, args.data_dir, history, args.trees, args.min_rows,
+                        args.max_auc_drop, args.dry_run, evaluate=not args.no_evaluation,
+                        calibrate=not args.no_calibration, rebuild=not args.no_rebuild)
+    finally:
+        history.close()
+    return 0 if record['promoted'] or args.dry_run or 'auc_after' not in record else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Timing spans and latency histograms for the hot paths.
+
+Code under measurement is wrapped in a span:
+
+    from cardiocare.metrics import span
+    with span("predict_proba"):
+        ...
+
+Each span name feeds a fixed-bucket histogram (one bisect and a few
+additions per observation), exposed in the Prometheus text format by the
+scoring service's ``GET /metrics``, by an optional exporter thread in the
+Streamlit process (``CARDIOCARE_METRICS_PORT``, on localhost unless
+``CARDIOCARE_METRICS_HOST`` says otherwise) and on the app's admin
+Metrics page (``CARDIOCARE_ADMIN=1``). Histograms are per process.
+Set CARDIOCARE_METRICS=0 to turn spans into no-ops.
+"""
+
+import bisect
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("CARDIOCARE_METRICS", "1") != "0"
+
+# Upper bounds in seconds, from 50 us (a cached prediction) to 10 s (a cold page)
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+           0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC = "cardiocare_span_seconds"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Counts of observations per bucket, plus their sum"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += seconds
+
+    def snapshot(self):
+        """(per-bucket counts, the last one above every bound; sum of observations)"""
+        with self._lock:
+            return list(self._counts), self._sum
+
+    def quantile(self, q, counts=None):
+        """Estimated ``q`` quantile, interpolated inside its bucket like Prometheus' histogram_quantile"""
+        counts = counts if counts is not None else self.snapshot()[0]
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class Registry:
+    """Histograms by span name"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        return histogram
+
+    def items(self):
+        with self._lock:
+            return sorted(self._histograms.items())
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def summary(self):
+        """{span: count, total/mean/p50/p95/p99 in ms} for display"""
+        rows = {}
+        for name, histogram in self.items():
+            counts, total = histogram.snapshot()
+            n = sum(counts)
+            if not n:
+                continue
+            rows[name] = {'count': n, 'total_ms': total * 1e3, 'mean_ms': total / n * 1e3}
+            for q in (0.5, 0.95, 0.99):
+                rows[name][f"p{round(q * 100)}_ms"] = histogram.quantile(q, counts) * 1e3
+        return rows
+
+    def prometheus(self):
+        """All histograms in the Prometheus text exposition format"""
+        lines = [f"# HELP {METRIC} Wall-clock time of instrumented CardioCare stages",
+                 f"# TYPE {METRIC} histogram"]
+        for name, histogram in self.items():
+            counts, total = histogram.snapshot()
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, n in zip(histogram.buckets, counts):
+                cumulative += n
+                lines.append(f'{METRIC}_bucket{{span="{label}",le="{bound:g}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{METRIC}_bucket{{span="{label}",le="+Inf"}} {cumulative}')
+            lines.append(f'{METRIC}_sum{{span="{label}"}} {total!r}')
+            lines.append(f'{METRIC}_count{{span="{label}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Span:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name):
+    """Context manager timing its block into the ``name`` histogram"""
+    return _Span(REGISTRY.histogram(name)) if ENABLED else _NO_SPAN
+
+
+def observe(name, seconds):
+    """Record a duration measured elsewhere"""
+    if ENABLED:
+        REGISTRY.histogram(name).observe(seconds)
+
+
+def start_exporter(port, host="127.0.0.1"):
+    """Serve ``GET /metrics`` for this process from a daemon thread; returns the server"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = REGISTRY.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+    return server
@@ -0,0 +1,182 @@
+"""
+Request coalescing in front of the scorer.
+
+``MicroBatcher`` runs an asyncio loop on a background thread. Each request
+hands over its encoded rows and waits; the loop collects whatever else
+arrives within ``max_wait_ms`` (or until ``max_rows`` rows are queued),
+scores them with one ``predict_proba`` call and fans the slices back out.
+A forest walk costs far less per row in a batch than one row at a time, so
+concurrent API requests share the work instead of queueing behind it.
+
+Requests larger than ``max_rows`` are scored directly. ``metrics.stats()``
+reports queue depth, batch sizes and p50/p99 request latency; the scoring
+service shows them under ``/health``.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from cardiocare.health import summarize
+from cardiocare.scoring import ENGINE_MAX_ROWS
+
+# Longest a request waits for others to join its batch
+MAX_WAIT_MS = 2.0
+# Rows per coalesced batch; the flat engine handles up to ENGINE_MAX_ROWS
+MAX_ROWS = ENGINE_MAX_ROWS
+# Recent requests/batches kept for the percentiles
+METRICS_WINDOW = 10_000
+
+
+def _percentiles(values):
+    if not values:
+        return {'p50': None, 'p99': None}
+    p50, p99 = np.percentile(np.fromiter(values, dtype=np.float64), [50, 99])
+    return {'p50': round(float(p50), 3), 'p99': round(float(p99), 3)}
+
+
+class BatchMetrics:
+    """Queue depth, batch size and latency counters, safe to read from any thread"""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self._lock = threading.Lock()
+        self.latencies_ms = deque(maxlen=window)
+        self.batch_rows = deque(maxlen=window)
+        self.requests = self.batches = self.rows = 0
+        self.queue_depth = self.max_queue_depth = 0
+
+    def queued(self, depth):
+        with self._lock:
+            self.queue_depth = depth
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def scored(self, n_requests, n_rows, latencies_ms, depth):
+        with self._lock:
+            self.requests += n_requests
+            self.batches += 1
+            self.rows += n_rows
+            self.batch_rows.append(n_rows)
+            self.latencies_ms.extend(latencies_ms)
+            self.queue_depth = depth
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'batches': self.batches,
+                'rows': self.rows,
+                'mean_batch_rows': round(self.rows / self.batches, 2) if self.batches else None,
+                'batch_rows': _percentiles(self.batch_rows),
+                'queue_depth': self.queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+                'latency_ms': _percentiles(self.latencies_ms),
+            }
+
+
+class MicroBatcher:
+    """Coalesce concurrent ``predict_proba`` calls into batched scorer calls"""
+
+    def __init__(self, scorer, max_rows=MAX_ROWS, max_wait_ms=MAX_WAIT_MS):
+        self.scorer = scorer
+        self.encoder = scorer.encoder
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1e3
+        self.metrics = BatchMetrics()
+        self._loop = asyncio.new_event_loop()
+        self._queue = asyncio.Queue()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._collector = self._loop.create_task(self._collect())
+        self._loop.call_soon(self._ready.set)
+        self._loop.run_forever()
+        self._loop.close()
+
+    async def submit(self, X):
+        """Class probabilities for encoded rows ``X``; must run on the batcher's loop"""
+        future = self._loop.create_future()
+        self._queue.put_nowait((X, time.perf_counter(), future))
+        self.metrics.queued(self._queue.qsize())
+        return await future
+
+    async def _collect(self):
+        carry = None
+        while True:
+            batch = [carry if carry is not None else await self._queue.get()]
+            carry = None
+            rows = len(batch[0][0])
+            deadline = self._loop.time() + self.max_wait
+            while rows < self.max_rows:
+                if self._queue.empty():
+                    timeout = deadline - self._loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                if rows + len(item[0]) > self.max_rows:
+                    # Starts the next batch instead of overfilling this one
+                    carry = item
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            await self._score(batch, rows)
+
+    async def _score(self, batch, rows):
+        X = batch[0][0] if len(batch) == 1 else np.concatenate([item[0] for item in batch])
+        try:
+            # Off the loop, so requests keep queueing for the next batch meanwhile
+            proba = await asyncio.to_thread(self.scorer.predict_proba, X)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        done = time.perf_counter()
+        offset = 0
+        for X_i, _, future in batch:
+            if not future.done():
+                future.set_result(proba[offset:offset + len(X_i)])
+            offset += len(X_i)
+        self.metrics.scored(len(batch), rows, [(done - submitted) * 1e3 for _, submitted, _ in batch],
+                            self._queue.qsize())
+
+    def predict_proba(self, X):
+        """Blocking ``predict_proba`` for request threads"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if len(X) > self.max_rows or not len(X):
+            return self.scorer.predict_proba(X)
+        return asyncio.run_coroutine_threadsafe(self.submit(X), self._loop).result()
+
+    def score(self, X):
+        return self.predict_proba(X)[:, 1]
+
+    def score_records(self, records):
+        """Same as ``Scorer.score_records``, batched with concurrent callers"""
+        probabilities = self.score(self.encoder.encode_records(records))
+        return [summarize(record, float(p), self.scorer.decision_threshold) for record, p in zip(records, probabilities)]
+
+    async def _shutdown(self):
+        self._collector.cancel()
+        try:
+            await self._collector
+        except asyncio.CancelledError:
+            pass
+        self._loop.stop()
+
+    def close(self):
+        """Stop the loop thread (requests still queued are not scored)"""
+        if self._thread.is_alive():
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+            self._thread.join()
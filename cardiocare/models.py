@@ -0,0 +1,97 @@
+"""
+Loading of the saved model objects in models/.
+
+The pickle-free artifact in models/artifact/ (see cardiocare.artifact) is
+preferred whenever it is current; the pickles remain the fallback. Pickles
+exported by cardiocare.training are checked against the hashes in its
+manifest.json, so a set left half-replaced by an interrupted export is
+refused rather than loaded as a new model with an old scaler.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+
+from cardiocare.metrics import span
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+MODEL_FILES = ["rf_model.pkl", "scaler.pkl", "feature_columns.pkl", "mappings.pkl"]
+# Written by cardiocare.training after the pickles, with their hashes
+MANIFEST_FILE = "manifest.json"
+
+
+def load_models(models_dir=MODELS_DIR):
+    """
+    Load (model, scaler, feature_columns, mappings), from the memory-mapped
+    artifact when it is current (model is then a FlatForest), else the pickles
+    """
+    from cardiocare import artifact
+
+    with span("load.models"):
+        if artifact.ENABLED:
+            if artifact.is_current(models_dir):
+                return artifact.load_artifact(models_dir)
+            if os.path.exists(artifact.artifact_dir(models_dir)):
+                print("models/artifact wasn't converted from these pickles, loading the pickles "
+                      "(python -m cardiocare.artifact converts them)", file=sys.stderr)
+        return load_pickles(models_dir)
+
+
+def check_complete(models_dir=MODELS_DIR):
+    """Raise when the pickles don't match the hashes of the export that wrote manifest.json"""
+    try:
+        with open(os.path.join(models_dir, MANIFEST_FILE)) as f:
+            files = json.load(f).get('files', {})
+    except (OSError, ValueError):
+        # Notebook pickles have no manifest
+        return
+    mismatched = [name for name, sha256 in files.items() if file_sha256(os.path.join(models_dir, name)) != sha256]
+    if mismatched:
+        raise ValueError(f"{', '.join(mismatched)} in {models_dir} don't match {MANIFEST_FILE}; "
+                         "an export was interrupted, so retrain (python -m cardiocare.training)")
+
+
+def load_pickles(models_dir=MODELS_DIR):
+    """Load (model, scaler, feature_columns, mappings) pickled by ModelTraining.ipynb or cardiocare.training"""
+    check_complete(models_dir)
+    with open(os.path.join(models_dir, "rf_model.pkl"), "rb") as f:
+        model = pickle.load(f)
+    with open(os.path.join(models_dir, "scaler.pkl"), "rb") as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(models_dir, "feature_columns.pkl"), "rb") as f:
+        feature_columns = pickle.load(f)
+    with open(os.path.join(models_dir, "mappings.pkl"), "rb") as f:
+        mappings = pickle.load(f)
+    return model, scaler, feature_columns, mappings
+
+
+def installed_version(models_dir=MODELS_DIR):
+    """model_version of ``models_dir``, or None when it holds no model (a table- or compact-only deployment)"""
+    try:
+        return model_version(models_dir)
+    except OSError:
+        return None
+
+
+def file_sha256(path):
+    """Hex SHA-256 of a file, read in 1 MiB blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def model_version(models_dir=MODELS_DIR, use_artifact=True):
+    """Short content hash of the saved model files; keys every derived artifact"""
+    from cardiocare import artifact
+
+    if use_artifact and artifact.ENABLED and artifact.is_current(models_dir):
+        # Recorded from the pickles at conversion, without rehashing them
+        return artifact.read_manifest(models_dir)['model_version']
+    digest = hashlib.sha256()
+    for name in MODEL_FILES:
+        digest.update(file_sha256(os.path.join(models_dir, name)).encode())
+    return digest.hexdigest()[:16]
@@ -0,0 +1,172 @@
+"""
+Multi-process batch inference over a shared-memory copy of the forest.
+
+``ParallelForest`` copies the FlatForest node arrays into shared memory once
+and starts a process pool whose workers map them in place, so no worker
+unpickles rf_model.pkl. Each batch is written to a shared input buffer and
+workers write their results straight into a shared output buffer; only
+(start, stop) ranges travel through the pool's pipes.
+
+Large batches are split into row blocks (every worker walks all trees for
+its rows); batches too small to keep every worker busy are split into tree
+blocks instead (every worker finds its trees' leaves for all rows, which
+the parent adds up). Either way each row's probability is its trees' leaf
+values added one tree at a time in tree order, the order sklearn's tree
+walk uses in-process, so the result is bit-identical for any number of
+workers, ``--workers 1`` included:
+
+    python -m cardiocare.batch data/cardio_train.csv scores.csv --workers 32
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from cardiocare.forest import FlatForest
+
+# Trees per tree-block task
+TREE_BLOCK = 16
+# Rows per row-block task
+MIN_TASK_ROWS = 512
+MAX_TASK_ROWS = 8192
+# Row-block tasks queued per worker, so uneven blocks even out
+TASKS_PER_WORKER = 4
+
+# Per-process worker state: the forest views and the attached segments
+_worker = {}
+
+
+def _share(array):
+    """Copy ``array`` into a new shared memory segment: (segment, spec)"""
+    segment = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, array.dtype, buffer=segment.buf)[...] = array
+    return segment, (segment.name, array.shape, array.dtype.str)
+
+
+def _view(segment, spec):
+    _, shape, dtype = spec
+    return np.ndarray(shape, np.dtype(dtype), buffer=segment.buf)
+
+
+def _attach(spec, role=None):
+    """Worker-side view of a shared array; ``role`` buffers are swapped when the parent reallocates"""
+    name = spec[0]
+    segments = _worker['segments']
+    if role is None:
+        segment = segments[name] = shared_memory.SharedMemory(name=name)
+        return _view(segment, spec)
+    current = segments.get(role)
+    if current is None or current.name != name:
+        if current is not None:
+            current.close()
+        current = segments[role] = shared_memory.SharedMemory(name=name)
+    return _view(current, spec)
+
+
+def _init_worker(forest_specs, classes, n_features):
+    _worker['segments'] = {}
+    arrays = {key: _attach(spec) for key, spec in forest_specs.items()}
+    _worker['forest'] = FlatForest.from_arrays(arrays, classes, n_features)
+
+
+def _score_rows(input_spec, output_spec, start, stop):
+    """Row-block task: all trees for rows [start, stop)"""
+    forest = _worker['forest']
+    X = _attach(input_spec, 'input')[start:stop]
+    _attach(output_spec, 'output')[start:stop] = forest._leaf_sum(forest._apply_block(X, forest.roots).T)
+
+
+def _score_trees(input_spec, output_spec, n_rows, block):
+    """Tree-block task: the leaf of every row in one block of trees"""
+    forest = _worker['forest']
+    X = _attach(input_spec, 'input')[:n_rows]
+    trees = slice(block * TREE_BLOCK, (block + 1) * TREE_BLOCK)
+    _attach(output_spec, 'output')[trees, :n_rows] = forest._apply_block(X, forest.roots[trees]).T
+
+
+class ParallelForest:
+    """Process-pool scoring of a FlatForest held in shared memory"""
+
+    def __init__(self, forest, workers=None, mp_context=None):
+        self.forest = forest
+        self.workers = workers or os.cpu_count() or 1
+        self.n_blocks = math.ceil(forest.n_estimators / TREE_BLOCK)
+        self._segments = {}
+        specs = {}
+        try:
+            for key, array in forest.arrays().items():
+                self._segments[key], specs[key] = _share(array)
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=mp_context, initializer=_init_worker,
+                                             initargs=(specs, forest.classes_, forest.n_features_in_))
+        except BaseException:
+            self._release(list(self._segments))
+            raise
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+
+    def _buffer(self, role, shape, dtype):
+        """Shared array of at least ``shape``, reused across batches and grown as needed"""
+        segment = self._segments.get(role)
+        size = max(1, math.prod(shape) * np.dtype(dtype).itemsize)
+        if segment is None or segment.size < size:
+            self._release([role])
+            segment = self._segments[role] = shared_memory.SharedMemory(create=True, size=size)
+        spec = (segment.name, shape, np.dtype(dtype).str)
+        return _view(segment, spec), spec
+
+    def _release(self, keys):
+        for key in keys:
+            segment = self._segments.pop(key, None)
+            if segment is not None:
+                segment.close()
+                segment.unlink()
+
+    def _row_tasks(self, n_rows):
+        """Row ranges, or None when there are too few rows to keep every worker busy"""
+        if n_rows < self.workers * MIN_TASK_ROWS:
+            return None
+        step = min(MAX_TASK_ROWS, max(MIN_TASK_ROWS, math.ceil(n_rows / (self.workers * TASKS_PER_WORKER))))
+        return [(start, min(start + step, n_rows)) for start in range(0, n_rows, step)]
+
+    def predict_proba(self, X):
+        """Mean class probabilities over all trees; identical for any worker count"""
+        X = self.forest._as_matrix(X)
+        n_rows, n_classes = len(X), len(self.classes_)
+        if not n_rows:
+            return np.empty((0, n_classes))
+        inputs, input_spec = self._buffer('input', X.shape, np.float32)
+        inputs[...] = X
+
+        row_tasks = self._row_tasks(n_rows)
+        if row_tasks is not None:
+            outputs, output_spec = self._buffer('output', (n_rows, n_classes), np.float64)
+            futures = [self._pool.submit(_score_rows, input_spec, output_spec, start, stop)
+                       for start, stop in row_tasks]
+            for future in futures:
+                future.result()
+            proba = outputs.copy()
+        else:
+            leaves, output_spec = self._buffer('output', (self.forest.n_estimators, n_rows), np.intp)
+            futures = [self._pool.submit(_score_trees, input_spec, output_spec, n_rows, block)
+                       for block in range(self.n_blocks)]
+            for future in futures:
+                future.result()
+            proba = self.forest._leaf_sum(leaves)
+        return proba / self.forest.n_estimators
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        self._pool.shutdown()
+        self._release(list(self._segments))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,102 @@
+"""Encoder + model bundle used by every prediction entry point."""
+
+import numpy as np
+
+from cardiocare.cache import prediction_key
+from cardiocare.encoder import FeatureEncoder
+from cardiocare.forest import FlatForest, compile_forest
+from cardiocare.health import summarize
+from cardiocare.metrics import span
+
+# Above this many rows sklearn's compiled tree walk beats the NumPy engine
+# (when there is an sklearn model: one loaded from the artifact is only flat)
+ENGINE_MAX_ROWS = 256
+
+
+class Scorer:
+    """Encode raw patient records and score them with the loaded model"""
+
+    def __init__(self, model, scaler, feature_columns, mappings, cache=None, version=None, calibration=None):
+        self.model = model
+        self.encoder = FeatureEncoder(feature_columns, mappings, scaler)
+        # Flat engine for the fast path; None falls back to sklearn
+        self.engine = compile_forest(model)
+        # Optional PredictionCache for small requests; ``version`` keeps models apart
+        self.cache = cache
+        self.version = version
+        # Optional ParallelForest for large batches (see cardiocare.parallel)
+        self.pool = None
+        self._explainer = self.engine
+        # Optional Calibration of the vote fractions and its decision threshold
+        self.calibration = calibration
+        self.decision_threshold = calibration.threshold if calibration is not None else 0.5
+
+    def predict_proba(self, X):
+        """Class probabilities for an encoded matrix, calibrated when a calibration is set"""
+        with span("predict.predict_proba"):
+            if self.cache is not None and len(X) <= ENGINE_MAX_ROWS:
+                proba = self._cached_predict_proba(X)
+            else:
+                proba = self._predict_proba(X)
+            if self.calibration is None:
+                return proba
+            positive = self.calibration(proba[:, 1])
+            return np.column_stack([1.0 - positive, positive])
+
+    def _cached_predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        keys = [prediction_key(self.version, row) for row in X]
+        rows = [self.cache.get(key) for key in keys]
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if missing:
+            for i, proba in zip(missing, self._predict_proba(X[missing])):
+                rows[i] = proba.copy()
+                self.cache.put(keys[i], rows[i])
+        return np.vstack(rows) if rows else self._predict_proba(X)
+
+    def _predict_proba(self, X):
+        if self.pool is not None and len(X) > ENGINE_MAX_ROWS:
+            return self.pool.predict_proba(X)
+        if self.engine is not None and (len(X) <= ENGINE_MAX_ROWS or self.engine is self.model):
+            return self.engine.predict_proba(X)
+        return self.model.predict_proba(self.encoder.to_frame(X))
+
+    def score(self, X):
+        """Probability of the positive (cardio) class for an encoded matrix"""
+        return self.predict_proba(X)[:, 1]
+
+    def explain(self, X):
+        """
+        Tree-path attributions to the positive-class probability, keyed by
+        input field (gender one-hot columns combined): ``(bias, [dict per row])``.
+        With a calibration, each row's attributions are stretched to add up
+        to its calibrated probability minus the calibrated bias.
+        None when the model isn't a forest of decision trees
+        """
+        if self._explainer is None:
+            # Flattened on demand when the fast path is disabled
+            try:
+                self._explainer = FlatForest.from_estimator(self.model)
+            except AttributeError:
+                return None
+        bias, contributions = self._explainer.contributions(X)
+        if self.calibration is not None:
+            change = contributions.sum(axis=1)
+            calibrated_bias = float(self.calibration(bias))
+            calibrated_change = self.calibration(bias + change) - calibrated_bias
+            stretch = np.divide(calibrated_change, change, out=np.ones_like(change), where=np.abs(change) > 1e-12)
+            bias, contributions = calibrated_bias, contributions * stretch[:, None]
+        fields = ['gender' if col in self.encoder.gender_columns else col
+                  for col in self.encoder.feature_columns]
+        rows = []
+        for row in contributions:
+            explanation = dict.fromkeys(fields, 0.0)
+            for field, value in zip(fields, row):
+                explanation[field] += float(value)
+            rows.append(explanation)
+        return bias, rows
+
+    def score_records(self, records):
+        """Probabilities and derived metrics for form-style records"""
+        probabilities = self.score(self.encoder.encode_records(records))
+        return [summarize(record, float(p), self.decision_threshold) for record, p in zip(records, probabilities)]
@@ -0,0 +1,281 @@
+"""
+Headless HTTP scoring service.
+
+Loads the models once, then forks worker processes that share the read-only
+model arrays copy-on-write and serve JSON on the same listening socket:
+
+    POST /predict        one form-style record    -> one result
+    POST /predict/batch  {"records": [...]}        -> {"results": [...]}
+    GET  /health
+    GET  /metrics        stage latency histograms, Prometheus text format
+
+Numeric fields must be finite numbers and categorical fields one of their
+form labels (400 otherwise); records may carry an optional ``patient_id``.
+Every prediction is logged to the history database (see cardiocare.history)
+unless ``--no-history``.
+Records failing the data-quality checks (see cardiocare.quality), such as
+values outside the Predict Risk form's ranges, are not scored: ``/predict``
+answers 400 and ``/predict/batch`` returns ``{"rejected": [reasons]}`` in
+their place. Probabilities are calibrated, and predictions thresholded, as
+fitted by cardiocare.calibration.
+
+Concurrent requests within a worker are coalesced into batched model calls
+(see cardiocare.microbatch); ``--batch-wait-ms`` bounds the added wait and
+``--no-batching`` scores every request on its own thread.
+
+``--scorer compact`` serves the compact forest (see cardiocare.compact)
+instead of the pickled model, for a much smaller footprint per worker.
+
+Histograms (see cardiocare.metrics) are kept per worker process, so each
+scrape of ``/metrics`` reports the worker that happened to accept it.
+
+Run with ``python -m cardiocare.service --port 8000 --workers 4``.
+"""
+
+import argparse
+import gc
+import json
+import math
+import numbers
+import os
+import signal
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cardiocare.cache import PredictionCache
+from cardiocare.calibration import load_calibration
+from cardiocare.encoder import CATEGORICAL_COLS, INPUT_FIELDS
+from cardiocare.history import HISTORY_DB, HistoryStore, make_entry
+from cardiocare.metrics import CONTENT_TYPE, REGISTRY, observe
+from cardiocare.microbatch import MAX_ROWS, MAX_WAIT_MS, MicroBatcher
+from cardiocare.models import MODELS_DIR, load_models, model_version
+from cardiocare.quality import RANGES, QualityFilter
+from cardiocare.scoring import Scorer
+
+MAX_BATCH = 10_000
+NUMERIC_FIELDS = ['age_years', 'height', 'weight', 'ap_hi', 'ap_lo']
+
+
+def parse_record(obj, mappings):
+    """Validate one JSON record in the Predict Risk form vocabulary"""
+    if not isinstance(obj, dict):
+        raise ValueError("Each record must be a JSON object")
+    missing = [field for field in INPUT_FIELDS if field not in obj]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+    record = {}
+    # Ranges are left to the quality checks, so a batch rejects records one by one
+    for field in NUMERIC_FIELDS:
+        value = obj[field]
+        try:
+            finite = not isinstance(value, bool) and isinstance(value, numbers.Real) and math.isfinite(value)
+        except OverflowError:
+            # An integer too large for a float
+            finite = False
+        if not finite:
+            raise ValueError(f"{field} must be a finite number")
+        record[field] = value
+    for field in CATEGORICAL_COLS + ['gender']:
+        value = obj[field]
+        if not isinstance(value, str) or value not in mappings[field]:
+            allowed = ", ".join(mappings[field])
+            raise ValueError(f"{field} must be one of: {allowed}")
+        record[field] = value
+    patient_id = obj.get('patient_id')
+    if patient_id is not None:
+        if isinstance(patient_id, bool) or not isinstance(patient_id, (str, int)):
+            raise ValueError("patient_id must be a string or integer")
+        record['patient_id'] = str(patient_id)
+    return record
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """JSON request handler; the scorer is attached to the server"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e.msg}") from None
+
+    def do_GET(self):
+        if self.path == "/health":
+            batcher = self.server.batcher
+            cache = getattr(self.server.scorer, "cache", None)
+            self._send_json(200, {"status": "ok", "pid": os.getpid(),
+                                  "decision_threshold": self.server.scorer.decision_threshold,
+                                  "prediction_cache": cache.stats() if cache is not None else None,
+                                  "batching": batcher.metrics.stats() if batcher is not None else None})
+        elif self.path == "/metrics":
+            self._send(200, REGISTRY.prometheus().encode("utf-8"), CONTENT_TYPE)
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        scorer = self.server.scorer
+        mappings = scorer.encoder.mappings
+        try:
+            payload = self._read_json()
+            if self.path == "/predict":
+                records = [parse_record(payload, mappings)]
+            elif self.path == "/predict/batch":
+                records = payload.get("records") if isinstance(payload, dict) else None
+                if not isinstance(records, list):
+                    raise ValueError('Body must be {"records": [...]}')
+                if len(records) > MAX_BATCH:
+                    raise ValueError(f"At most {MAX_BATCH} records per batch")
+                records = [parse_record(record, mappings) for record in records]
+            else:
+                self._send_json(404, {"error": "Not found"})
+                return
+            # Each request stands alone, so repeated records are still scored
+            keep, reasons = QualityFilter(drop_duplicates=False).check(
+                {col: [record[col] for record in records] for col in RANGES})
+            if self.path == "/predict" and not keep[0]:
+                raise ValueError(f"Implausible record: {reasons[0].replace(';', ', ')}")
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        clean = [record for record, ok in zip(records, keep) if ok]
+        start = time.perf_counter()
+        scored = (self.server.batcher or scorer).score_records(clean) if clean else []
+        latency_ms = (time.perf_counter() - start) * 1e3
+        observe("service.score", latency_ms / 1e3)
+
+        history = self.server.history
+        if history is not None:
+            for record, result in zip(clean, scored):
+                history.log(make_entry(record, result, scorer.version, latency_ms,
+                                       patient_id=record.get('patient_id'), source="api"))
+
+        if self.path == "/predict":
+            self._send_json(200, scored[0])
+        else:
+            scored = iter(scored)
+            self._send_json(200, {"results": [next(scored) if ok else {"rejected": reason.split(";")}
+                                              for ok, reason in zip(keep, reasons)]})
+
+    def log_message(self, format, *args):
+        # Access logging per request is too slow at hundreds of requests/s
+        pass
+
+
+def _start_threads(server, history_db, batching):
+    """Per-process history writer and micro-batcher (threads don't survive fork())"""
+    server.history = HistoryStore(history_db) if history_db else None
+    server.batcher = MicroBatcher(server.scorer, **batching) if batching is not None else None
+
+
+def _stop_threads(server):
+    if server.batcher is not None:
+        server.batcher.close()
+    if server.history is not None:
+        server.history.close()
+
+
+def serve(host="127.0.0.1", port=8000, workers=1, models_dir=MODELS_DIR, history_db=HISTORY_DB,
+          batch_wait_ms=MAX_WAIT_MS, batch_rows=MAX_ROWS, scorer="forest"):
+    """
+    Load the models, bind the socket and serve with ``workers`` processes;
+    ``history_db=None`` disables the prediction log and ``batch_wait_ms=None``
+    the request coalescing; ``scorer="compact"`` serves compact_forest.npz
+    """
+    server = ThreadingHTTPServer((host, port), ScoringHandler)
+    server.daemon_threads = True
+    if scorer == "compact":
+        from cardiocare.compact import CompactForest
+        server.scorer = CompactForest.load(models_dir)
+    else:
+        # Each worker fills its own cache, shared by its request threads
+        version = model_version(models_dir)
+        server.scorer = Scorer(*load_models(models_dir), cache=PredictionCache(), version=version,
+                               calibration=load_calibration(models_dir, expected_version=version))
+
+    # Writer and batcher threads don't survive fork(); every process starts its own
+    server.history = server.batcher = None
+    batching = None if batch_wait_ms is None else {'max_wait_ms': batch_wait_ms, 'max_rows': batch_rows}
+
+    if workers <= 1 or not hasattr(os, "fork"):
+        _start_threads(server, history_db, batching)
+        print(f"Serving on http://{host}:{port} (1 process)", file=sys.stderr)
+        try:
+            server.serve_forever()
+        finally:
+            _stop_threads(server)
+        return
+
+    # Keep the loaded model out of the GC's reach so forked workers
+    # don't dirty (and copy) its pages
+    gc.freeze()
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            # Leave through the finally below, so queued history rows are written
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+            _start_threads(server, history_db, batching)
+            try:
+                server.serve_forever()
+            finally:
+                _stop_threads(server)
+                os._exit(0)
+        children.append(pid)
+
+    print(f"Serving on http://{host}:{port} ({workers} worker processes)", file=sys.stderr)
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for pid in children:
+        os.waitpid(pid, 0)
+    server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CardioCare headless scoring service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes sharing the loaded model")
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--scorer", choices=["forest", "compact"], default="forest",
+                        help="pickled forest, or compact_forest.npz from cardiocare.compact")
+    parser.add_argument("--history-db", default=HISTORY_DB, help="SQLite prediction log")
+    parser.add_argument("--no-history", action="store_true", help="don't log predictions")
+    parser.add_argument("--batch-wait-ms", type=float, default=MAX_WAIT_MS,
+                        help="longest a request waits for others to share its model call")
+    parser.add_argument("--batch-rows", type=int, default=MAX_ROWS, help="rows per coalesced model call")
+    parser.add_argument("--no-batching", action="store_true", help="score every request separately")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.workers, args.models_dir,
+          history_db=None if args.no_history else args.history_db,
+          batch_wait_ms=None if args.no_batching else args.batch_wait_ms, batch_rows=args.batch_rows,
+          scorer=args.scorer)
+
+
+if __name__ == "__main__":
+    main()
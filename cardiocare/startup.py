@@ -0,0 +1,73 @@
+"""
+Cold-start report: import cost and first-visit load time of every page.
+
+Each page is measured in a fresh interpreter (after importing streamlit,
+which every page pays for anyway), so the numbers match a cold pod:
+
+    python -m cardiocare.startup
+    python -m cardiocare.startup --json startup.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+from cardiocare.views import PAGES
+
+# Runs in the child interpreter; prints one JSON line
+_PROBE = r"""
+import importlib, json, logging, sys, time
+logging.disable(logging.WARNING)  # "no runtime" cache warnings outside streamlit run
+t0 = time.perf_counter()
+import streamlit
+t1 = time.perf_counter()
+baseline = set(sys.modules)
+module = importlib.import_module(sys.argv[1])
+t2 = time.perf_counter()
+warm = getattr(module, "warm", None)
+if warm is not None:
+    warm()
+t3 = time.perf_counter()
+heavy = sorted(m for m in ("pandas", "numpy", "matplotlib", "seaborn", "sklearn")
+               if m in sys.modules and m not in baseline)
+print(json.dumps({
+    "streamlit_ms": (t1 - t0) * 1e3,
+    "import_ms": (t2 - t1) * 1e3,
+    "first_visit_ms": (t3 - t2) * 1e3,
+    "new_modules": len(set(sys.modules) - baseline),
+    "heavy_imports": heavy,
+}))
+"""
+
+
+def measure_page(module, python=sys.executable):
+    """Cold import/first-visit timings for one page module"""
+    result = subprocess.run([python, "-c", _PROBE, module], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def startup_report():
+    return {label: measure_page(module) for label, module in PAGES.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-page cold-start cost of the Streamlit app")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = startup_report()
+    print(f"{'Page':<24}{'import ms':>11}{'first visit ms':>16}{'modules':>9}  heavy imports")
+    for label, row in report.items():
+        print(f"{label:<24}{row['import_ms']:>11.0f}{row['first_visit_ms']:>16.0f}"
+              f"{row['new_modules']:>9}  {', '.join(row['heavy_imports']) or '-'}")
+    streamlit_ms = min(row["streamlit_ms"] for row in report.values())
+    print(f"\nstreamlit itself: {streamlit_ms:.0f} ms (paid by every page)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
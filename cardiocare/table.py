@@ -0,0 +1,322 @@
+"""
+Precomputed risk table ("table mode") for CPU-poor deployments.
+
+Every model input is bounded: the five numeric form fields and 144
+combinations of cholesterol, glucose, smoking, alcohol, activity and
+gender. The live forest is scored once on a grid of knots per numeric
+field for every combination, and the probabilities are stored as a
+uint16 array in ``models/risk_table.npy`` (memory-mapped on load), with
+knots, label mappings and a validation report in ``risk_table.json``.
+
+At prediction time the categorical fields pick a slice by index
+arithmetic and the numeric fields are interpolated multilinearly between
+the surrounding knots. Only NumPy is needed, not sklearn or the pickles:
+
+    python -m cardiocare.table                  # build + validate
+    CARDIOCARE_SCORER=table streamlit run app.py
+
+Nothing is written if, on the held-out test split, the table's mean
+absolute error exceeds ``--max-error`` or it agrees with the forest's
+prediction on fewer than ``--min-agreement`` of the rows; denser
+``--knots`` bring it back within bounds. Loading refuses a table whose
+stored validation misses those limits, or that was built for another
+model than the one in models/.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from cardiocare.calibration import load_calibration
+from cardiocare.encoder import CATEGORICAL_COLS, FeatureEncoder
+from cardiocare.health import summarize
+from cardiocare.metrics import span
+from cardiocare.models import MODELS_DIR, installed_version
+
+FORMAT_VERSION = 1
+TABLE_FILE = "risk_table.npy"
+TABLE_MANIFEST = "risk_table.json"
+
+# Probabilities are stored in steps of 1/LEVELS
+LEVELS = np.iinfo(np.uint16).max
+
+# Knots per numeric field: the Predict Risk form bounds at both ends,
+# denser where the training data lives (ages 40-64 in 2 year steps, weights
+# 50-90 kg in 5 kg steps, systolic BP around 120), so the default table
+# passes MAX_ERROR / MIN_AGREEMENT
+KNOTS = {
+    'age_years': [18, 30, 35, 40, 42, 44, 46, 48, 50, 52, 54, 56, 58, 60, 62, 64, 100],
+    'height': [120, 150, 160, 170, 180, 190, 220],
+    'weight': [30, 50, 55, 60, 65, 70, 75, 80, 85, 90, 100, 120, 200],
+    'ap_hi': [80, 100, 110, 115, 120, 125, 130, 140, 150, 160, 180, 250],
+    'ap_lo': [40, 60, 70, 80, 90, 100, 150],
+}
+
+# Random form inputs scored by both the table and the forest in the validation report
+VALIDATION_SAMPLES = 100_000
+# Largest mean |error| and smallest share of the forest's predictions kept, on the test split
+MAX_ERROR = 0.02
+MIN_AGREEMENT = 0.98
+
+
+def failed_validation(manifest):
+    """Why the table's test split validation misses its limits, or None when it passes"""
+    limits = manifest.get('limits', {'max_error': MAX_ERROR, 'min_agreement': MIN_AGREEMENT})
+    test = manifest.get('validation', {}).get('test_split')
+    if test is None:
+        return "it has no test split validation"
+    if test['mean_abs_error'] > limits['max_error'] or test['same_prediction'] < limits['min_agreement']:
+        return (f"test split mean |error| {test['mean_abs_error']:.4f} (max {limits['max_error']}), "
+                f"same prediction {test['same_prediction']:.2%} (min {limits['min_agreement']:.2%})")
+    return None
+
+
+def categorical_levels(mappings):
+    """[(field, values)] of the categorical table axes, in index order"""
+    levels = [(col, sorted(set(mappings[col].values()))) for col in CATEGORICAL_COLS]
+    levels.append(('gender', list(mappings['gender'])))
+    return levels
+
+
+def quantize(probability):
+    return np.rint(np.clip(probability, 0, 1) * LEVELS).astype(np.uint16)
+
+
+def build_table(scorer, knots=KNOTS, verbose=True):
+    """Score the forest on every knot of every categorical combination"""
+    encoder = scorer.encoder
+    axes = list(knots)
+    grid = np.meshgrid(*[np.asarray(knots[axis], dtype=np.float64) for axis in axes], indexing="ij")
+    numeric = {axis: values.ravel() for axis, values in zip(axes, grid)}
+    n_points = grid[0].size
+
+    levels = categorical_levels(encoder.mappings)
+    combos = list(itertools.product(*[values for _, values in levels]))
+    table = np.empty((len(combos), n_points), dtype=np.uint16)
+    start = time.perf_counter()
+    for i, combo in enumerate(combos):
+        features = dict(numeric)
+        for (col, _), value in zip(levels, combo):
+            if col == 'gender':
+                for gender_col, code in encoder.mappings['gender'][value].items():
+                    features[gender_col] = np.full(n_points, float(code))
+            else:
+                features[col] = np.full(n_points, float(value))
+        table[i] = quantize(scorer.score(encoder.encode_features(features)))
+        if verbose and (i + 1) % 16 == 0:
+            print(f"  {i + 1}/{len(combos)} combinations, {time.perf_counter() - start:.0f}s", file=sys.stderr)
+    return table.reshape(len(combos), *[len(knots[axis]) for axis in axes])
+
+
+class RiskTable:
+    """Scorer-compatible predictions from the precomputed table"""
+
+    def __init__(self, table, manifest, calibration=None):
+        self.table = table
+        self.manifest = manifest
+        self.version = manifest['model_version']
+        self.axes = list(manifest['knots'])
+        self.knots = [np.asarray(manifest['knots'][axis], dtype=np.float64) for axis in self.axes]
+        self.levels = [(col, values) for col, values in manifest['levels']]
+        # Raw (unscaled) features in the model's column order
+        self.encoder = FeatureEncoder(manifest['feature_columns'], manifest['mappings'], scaler=None)
+        # Optional Calibration of the forest's probabilities (see cardiocare.calibration)
+        self.calibration = calibration
+        self.decision_threshold = calibration.threshold if calibration is not None else 0.5
+        columns = self.encoder.feature_columns
+
+        # Category slice for every combination of categorical column codes
+        # (gender as its one-hot columns); -1 marks combinations not in the table
+        patterns = []
+        for col, values in self.levels:
+            if col == 'gender':
+                onehots = list(self.encoder.mappings['gender'].values())
+                gender_cols = list(onehots[0])
+                patterns.append((gender_cols, [[onehot[c] for c in gender_cols] for onehot in onehots]))
+            else:
+                patterns.append(([col], [[value] for value in values]))
+        self._categorical = [columns.index(c) for cols, _ in patterns for c in cols]
+        self._category_shape = np.array([max(p[k] for p in codes) + 1
+                                         for cols, codes in patterns for k in range(len(cols))])
+        self._category_lookup = np.full(self._category_shape, -1, dtype=np.intp)
+        for i, combo in enumerate(itertools.product(*[codes for _, codes in patterns])):
+            self._category_lookup[tuple(code for pattern in combo for code in pattern)] = i
+
+        # Numeric axes: every axis' knots offset into one sorted array,
+        # so a single searchsorted finds the cell on all axes
+        self._numeric = [columns.index(axis) for axis in self.axes]
+        self._lo = np.array([knots[0] for knots in self.knots])
+        self._hi = np.array([knots[-1] for knots in self.knots])
+        span = float(self._hi.max() - self._lo.min()) + 1
+        self._offset = np.arange(len(self.axes)) * span - self._lo.min()
+        self._flat_knots = np.concatenate([knots + offset for knots, offset in zip(self.knots, self._offset)])
+        self._first = np.cumsum([0] + [len(knots) for knots in self.knots[:-1]])
+        self._last_cell = np.array([len(knots) - 2 for knots in self.knots])
+        # Offsets of the 2^d corners of a grid cell, shape (corners, axes)
+        self._corners = np.array(list(itertools.product((0, 1), repeat=len(self.axes))), dtype=np.intp)
+
+    @classmethod
+    def load(cls, models_dir=MODELS_DIR):
+        with open(os.path.join(models_dir, TABLE_MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"{TABLE_MANIFEST} has an unsupported format; rebuild it")
+        table = np.load(os.path.join(models_dir, TABLE_FILE), mmap_mode="r")
+        expected = (int(np.prod([len(values) for _, values in manifest['levels']])),
+                    *[len(knots) for knots in manifest['knots'].values()])
+        if table.shape != expected:
+            raise ValueError(f"{TABLE_FILE} has shape {table.shape}, expected {expected}; rebuild it")
+        failure = failed_validation(manifest)
+        if failure is not None:
+            raise ValueError(f"{TABLE_MANIFEST} fails its validation: {failure}; rebuild it with denser knots")
+        current = installed_version(models_dir)
+        if current is not None and current != manifest['model_version']:
+            raise ValueError(f"{TABLE_FILE} was built for model {manifest['model_version']}, "
+                             f"the installed model is {current}; rebuild it")
+        return cls(table, manifest, load_calibration(models_dir, expected_version=manifest['model_version']))
+
+    def _category_index(self, X):
+        codes = X[:, self._categorical]
+        index = codes.astype(np.intp)
+        valid = ((index == codes) & (index >= 0) & (index < self._category_shape)).all(axis=1)
+        category = self._category_lookup[tuple(np.where(valid[:, None], index, 0).T)]
+        if not (valid & (category >= 0)).all():
+            raise ValueError("Categorical values outside the risk table")
+        return category
+
+    def lookup(self, features):
+        """Interpolated probabilities for the output of ``FeatureEncoder.raw_features``"""
+        return self.score(self.encoder.encode_features(features))
+
+    def score(self, X):
+        """Probability of the positive class for an (unscaled) encoded matrix"""
+        with span("predict.predict_proba"):
+            X = np.asarray(X, dtype=np.float64)
+            category = self._category_index(X)
+
+            # Clamp to the grid, as the forest is flat beyond the training range
+            values = np.minimum(np.maximum(X[:, self._numeric], self._lo), self._hi)
+            # Lower corner of each row's grid cell and the position inside it, per axis
+            flat = np.searchsorted(self._flat_knots, values + self._offset, side="right") - 1
+            lower = np.minimum(flat - self._first, self._last_cell)
+            below = self._flat_knots[self._first + lower] - self._offset
+            above = self._flat_knots[self._first + lower + 1] - self._offset
+            fraction = (values - below) / (above - below)
+
+            # All 2^d cell corners gathered at once: (rows, corners) indices and weights
+            index = lower[:, None, :] + self._corners
+            weight = np.where(self._corners, fraction[:, None, :], 1 - fraction[:, None, :]).prod(axis=2)
+            corner_values = self.table[(category[:, None], *np.moveaxis(index, 2, 0))]
+            probability = (weight * corner_values).sum(axis=1) / LEVELS
+            return probability if self.calibration is None else self.calibration(probability)
+
+    def predict_proba(self, X):
+        probability = self.score(X)
+        return np.column_stack([1 - probability, probability])
+
+    def explain(self, X):
+        """The table keeps no tree paths to attribute"""
+        return None
+
+    def score_records(self, records):
+        probabilities = self.score(self.encoder.encode_records(records))
+        return [summarize(record, float(p), self.decision_threshold) for record, p in zip(records, probabilities)]
+
+
+def validate(table, scorer, data_dir=None, n_samples=VALIDATION_SAMPLES, seed=0):
+    """Deviation of the table from the live forest on the test split and on random form inputs"""
+    from cardiocare.dataset import DATA_DIR, load_frame
+    from cardiocare.evaluation import split_indices
+    from cardiocare.quality import clean_mask
+
+    df = load_frame("cardio_preprocessed", data_dir or DATA_DIR)
+    _, test_idx = split_indices(len(df), keep=clean_mask(df))
+    samples = {'test_split': scorer.encoder.raw_features(df.iloc[test_idx])}
+
+    rng = np.random.default_rng(seed)
+    inputs = {axis: rng.integers(knots[0], knots[-1] + 1, n_samples) for axis, knots in zip(table.axes, table.knots)}
+    for col in CATEGORICAL_COLS:
+        inputs[col] = rng.choice(sorted(set(table.encoder.mappings[col].values())), n_samples)
+    inputs['gender'] = rng.integers(1, 3, n_samples)
+    samples['random_form_inputs'] = scorer.encoder.raw_features(inputs)
+
+    report = {}
+    for name, features in samples.items():
+        expected = scorer.score(scorer.encoder.encode_features(features))
+        approximate = table.lookup(features)
+        error = np.abs(approximate - expected)
+        report[name] = {
+            'rows': int(len(error)),
+            'max_abs_error': float(error.max()),
+            'mean_abs_error': float(error.mean()),
+            'p99_abs_error': float(np.percentile(error, 99)),
+            'same_prediction': float(np.mean((approximate >= 0.5) == (expected >= 0.5))),
+        }
+    return report
+
+
+def write_table(table, manifest, models_dir=MODELS_DIR):
+    """Write the array, then the manifest that makes it current"""
+    tmp = os.path.join(models_dir, f".{TABLE_FILE}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, table)
+    os.replace(tmp, os.path.join(models_dir, TABLE_FILE))
+    tmp = os.path.join(models_dir, f".{TABLE_MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(models_dir, TABLE_MANIFEST))
+
+
+def main(argv=None):
+    from cardiocare.models import load_models, model_version
+    from cardiocare.scoring import Scorer
+
+    parser = argparse.ArgumentParser(description="Build and validate the precomputed risk table")
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--knots", type=json.loads, default=KNOTS,
+                        help="JSON {field: [knots...]} for the numeric fields")
+    parser.add_argument("--samples", type=int, default=VALIDATION_SAMPLES)
+    parser.add_argument("--max-error", type=float, default=MAX_ERROR,
+                        help="refuse to write a table with a larger mean |error| on the test split")
+    parser.add_argument("--min-agreement", type=float, default=MIN_AGREEMENT,
+                        help="refuse to write a table agreeing with fewer of the forest's test split predictions")
+    args = parser.parse_args(argv)
+
+    scorer = Scorer(*load_models(args.models_dir))
+    start = time.perf_counter()
+    array = build_table(scorer, args.knots)
+    build_seconds = time.perf_counter() - start
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'model_version': model_version(args.models_dir),
+        'feature_columns': scorer.encoder.feature_columns,
+        'mappings': scorer.encoder.mappings,
+        'levels': categorical_levels(scorer.encoder.mappings),
+        'knots': args.knots,
+        'build_seconds': round(build_seconds, 1),
+        'limits': {'max_error': args.max_error, 'min_agreement': args.min_agreement},
+    }
+    manifest['validation'] = validate(RiskTable(array, manifest), scorer, n_samples=args.samples)
+
+    print(f"Built {array.shape} table ({array.nbytes / 2**20:.1f} MiB) in {build_seconds:.0f}s", file=sys.stderr)
+    for name, row in manifest['validation'].items():
+        print(f"  {name}: max |error| {row['max_abs_error']:.4f}, mean {row['mean_abs_error']:.4f}, "
+              f"p99 {row['p99_abs_error']:.4f}, same prediction {row['same_prediction']:.2%} "
+              f"({row['rows']:,} rows)", file=sys.stderr)
+    failure = failed_validation(manifest)
+    if failure is not None:
+        print(f"{TABLE_FILE} not written: {failure}", file=sys.stderr)
+        return 1
+    write_table(array, manifest, args.models_dir)
+    print(f"Wrote {TABLE_FILE}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Scriptable training pipeline extracted from the notebooks.
+
+Runs cardio_train.ipynb's preprocessing (age in years, gender labels,
+integer weight, height/weight/BP outlier filters) and ModelTraining.ipynb's
+split, scaling, GridSearchCV and export end to end. Rows the data-quality
+checks reject (see cardiocare.quality) are left out of both sides of the
+notebook's split:
+
+    python -m cardiocare.training
+    python -m cardiocare.training --search halving   # see cardiocare.search
+
+All four artifacts (rf_model.pkl, scaler.pkl, feature_columns.pkl,
+mappings.pkl) are written to temporary files first and moved into models/
+only after every one of them was written, followed by ``manifest.json``
+with per-stage timings, metrics and file hashes, and the pickle-free copy
+in models/artifact/ (see cardiocare.artifact), which then gets the new
+model's probability calibration (see cardiocare.calibration). Each file
+is replaced atomically but the set is not: a crash between two
+replacements leaves pickles from both runs, which ``load_pickles``
+refuses because they don't match the manifest's hashes.
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from cardiocare.dataset import DATA_DIR, DATASETS, load_frame
+from cardiocare.encoder import NUM_COLS
+from cardiocare.evaluation import RANDOM_STATE, split_indices
+from cardiocare.models import MANIFEST_FILE, MODELS_DIR, file_sha256, model_version
+from cardiocare.quality import QualityFilter, normalize
+
+
+# Hyperparameter grid searched in ModelTraining.ipynb
+PARAM_GRID = {
+    "n_estimators": [100, 200],
+    "max_depth": [None, 10, 20],
+    "min_samples_split": [2, 5],
+    "min_samples_leaf": [1, 2],
+    "max_features": ["sqrt", "log2"]
+}
+
+# Form labels -> model codes, as saved to mappings.pkl by ModelTraining.ipynb
+MAPPINGS = {
+    "cholesterol": {"normal": 1, "above_normal": 2, "well_above": 3},
+    "gluc": {"normal": 1, "above_normal": 2, "well_above": 3},
+    "smoke": {"no": 0, "yes": 1},
+    "alco": {"no": 0, "yes": 1},
+    "active": {"no": 0, "yes": 1},
+    "gender": {
+        "Male": {"gender_Male": 1, "gender_Female": 0},
+        "Female": {"gender_Male": 0, "gender_Female": 1}
+    }
+}
+
+
+class StageTimer:
+    """Wall-clock seconds per named pipeline stage"""
+
+    def __init__(self, verbose=True):
+        self.timings = {}
+        self.verbose = verbose
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        yield
+        self.timings[name] = round(time.perf_counter() - start, 3)
+        if self.verbose:
+            print(f"[{name}] {self.timings[name]:.1f}s", file=sys.stderr)
+
+
+def preprocess(raw):
+    """cardio_train.ipynb preprocessing: raw cardio_train rows -> cardio_preprocessed rows"""
+    df = normalize(raw)
+    # Only the notebook's range filters: its rows define the train/test split
+    keep, _ = QualityFilter(check_bp_order=False, drop_duplicates=False).check(df)
+    return df[keep].reset_index(drop=True)
+
+
+def build_features(df):
+    """ModelTraining.ipynb features: (X with gender one-hot, y)"""
+    X = pd.get_dummies(df.drop(['cardio', 'id', 'age'], axis=1), columns=['gender'])
+    return X, df['cardio'].to_numpy()
+
+
+def split_and_scale(X, y, keep=None):
+    """Notebook train/test split of the ``keep`` rows, with StandardScaler fitted on the training rows"""
+    from sklearn.preprocessing import StandardScaler
+
+    train_idx, test_idx = split_indices(len(X), keep=keep)
+    X_train, X_test = X.iloc[train_idx].copy(), X.iloc[test_idx].copy()
+    scaler = StandardScaler()
+    X_train[NUM_COLS] = scaler.fit_transform(X_train[NUM_COLS])
+    X_test[NUM_COLS] = scaler.transform(X_test[NUM_COLS])
+    return X_train, X_test, y[train_idx], y[test_idx], scaler
+
+
+def grid_search(X_train, y_train, param_grid=PARAM_GRID, cv=5, n_jobs=-1):
+    """Cross-validated accuracy of every grid candidate, fitted on all cores"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import GridSearchCV
+
+    grid = GridSearchCV(
+        RandomForestClassifier(random_state=RANDOM_STATE),
+        param_grid,
+        cv=cv,
+        scoring="accuracy",
+        n_jobs=n_jobs,
+        # Refit separately with a parallel forest instead of one core
+        refit=False
+    )
+    grid.fit(X_train, y_train)
+    return grid.best_params_, float(grid.best_score_)
+
+
+def fit_final(X_train, y_train, params, n_jobs=-1):
+    from sklearn.ensemble import RandomForestClassifier
+
+    model = RandomForestClassifier(random_state=RANDOM_STATE, n_jobs=n_jobs, **params)
+    model.fit(X_train, y_train)
+    # Single-patient predictions are faster without a thread pool
+    model.set_params(n_jobs=None)
+    return model
+
+
+def score_test(model, X_test, y_test):
+    from sklearn.metrics import accuracy_score, roc_auc_score
+
+    y_prob = model.predict_proba(X_test)[:, 1]
+    return {
+        'accuracy': float(accuracy_score(y_test, (y_prob >= 0.5).astype(int))),
+        'roc_auc': float(roc_auc_score(y_test, y_prob)),
+    }
+
+
+def _write_json(obj, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(obj, f, indent=2)
+    os.replace(tmp, path)
+
+
+def export_artifacts(models_dir, artifacts, manifest):
+    """
+    Pickle every artifact to a temporary file, then move them into place
+    one by one and write the manifest (with file hashes) last; the hashes
+    are what tells a complete set from one cut short between two moves
+    """
+    os.makedirs(models_dir, exist_ok=True)
+    staged = {}
+    try:
+        for name, obj in artifacts.items():
+            tmp = os.path.join(models_dir, f".{name}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(obj, f)
+                f.flush()
+                os.fsync(f.fileno())
+            staged[name] = tmp
+    except BaseException:
+        for tmp in staged.values():
+            os.remove(tmp)
+        raise
+
+    manifest['files'] = {name: file_sha256(tmp) for name, tmp in staged.items()}
+    for name, tmp in staged.items():
+        os.replace(tmp, os.path.join(models_dir, name))
+
+    _write_json(manifest, os.path.join(models_dir, MANIFEST_FILE))
+
+
+def train(models_dir=MODELS_DIR, data_dir=DATA_DIR, param_grid=PARAM_GRID, cv=5, n_jobs=-1,
+          search="grid", evaluate=True, calibrate=True, verbose=True):
+    """Run the whole pipeline and export the artifacts; returns the manifest"""
+    import sklearn
+
+    timer = StageTimer(verbose)
+    with timer.stage("load"):
+        raw = load_frame("cardio_train", data_dir)
+    with timer.stage("preprocess"):
+        df = preprocess(raw)
+        quality = QualityFilter()
+        keep, _ = quality.check(df)
+        X, y = build_features(df)
+    with timer.stage("split_scale"):
+        X_train, X_test, y_train, y_test, scaler = split_and_scale(X, y, keep)
+    search_history = None
+    with timer.stage("search"):
+        if search == "halving":
+            from cardiocare.search import FoldCache, halving_search
+            best_params, best_cv_score, search_history = halving_search(
+                FoldCache(X_train, y_train, cv), param_grid, n_jobs=n_jobs, verbose=verbose)
+        else:
+            best_params, best_cv_score = grid_search(X_train, y_train, param_grid, cv, n_jobs)
+    with timer.stage("fit"):
+        model = fit_final(X_train, y_train, best_params, n_jobs)
+    with timer.stage("test"):
+        test_metrics = score_test(model, X_test, y_test)
+
+    manifest = {
+        'created': datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        'sklearn_version': sklearn.__version__,
+        'data_sha256': file_sha256(os.path.join(data_dir, DATASETS["cardio_train"]["file"])),
+        'n_rows': int(keep.sum()),
+        'quality': quality.stats(),
+        'n_train': int(len(X_train)),
+        'n_test': int(len(X_test)),
+        'search': search,
+        'param_grid': param_grid,
+        'best_params': best_params,
+        'best_cv_accuracy': best_cv_score,
+        'search_rounds': search_history,
+        'test_metrics': test_metrics,
+        'class_balance': float(np.mean(y[keep])),
+    }
+    # Writing the artifact drops the old model's calibration; its threshold carries over
+    from cardiocare.calibration import current_threshold
+    threshold = current_threshold(models_dir)
+    with timer.stage("export"):
+        export_artifacts(models_dir, {
+            "rf_model.pkl": model,
+            "scaler.pkl": scaler,
+            "feature_columns.pkl": X.columns.tolist(),
+            "mappings.pkl": MAPPINGS,
+        }, manifest)
+        # Pickle-free copy that load_models() prefers
+        from cardiocare.artifact import write_artifact
+        write_artifact(models_dir, model, scaler, X.columns.tolist(), MAPPINGS,
+                       model_version(models_dir, use_artifact=False))
+
+    if calibrate:
+        # Fitted to the new model on its held-out split
+        from cardiocare import calibration
+        with timer.stage("calibration"):
+            calibration.main(["--models-dir", models_dir, "--data-dir", data_dir, "--threshold", str(threshold)])
+
+    if evaluate:
+        # The stored Model Analysis results belong to the previous model now
+        from cardiocare import evaluation
+        with timer.stage("evaluation"):
+            evaluation.main(["--models-dir", models_dir, "--data-dir", data_dir])
+
+    manifest['timings'] = timer.timings
+    _write_json(manifest, os.path.join(models_dir, MANIFEST_FILE))
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train and export the Random Forest end to end")
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="cores to use (-1 = all)")
+    parser.add_argument("--search", choices=["grid", "halving"], default="grid",
+                        help="exhaustive GridSearchCV or successive halving (see cardiocare.search)")
+    parser.add_argument("--param-grid", type=json.loads, default=PARAM_GRID,
+                        help="JSON parameter grid (defaults to the notebook's grid)")
+    parser.add_argument("--no-evaluation", action="store_true",
+                        help="skip rebuilding models/evaluation.json")
+    parser.add_argument("--no-calibration", action="store_true",
+                        help="skip fitting the probability calibration (see cardiocare.calibration)")
+    args = parser.parse_args(argv)
+
+    manifest = train(args.models_dir, args.data_dir, args.param_grid, args.cv, args.n_jobs,
+                     search=args.search, evaluate=not args.no_evaluation, calibrate=not args.no_calibration)
+    print(f"Best params {manifest['best_params']} | CV accuracy {manifest['best_cv_accuracy']:.2%} | "
+          f"test accuracy {manifest['test_metrics']['accuracy']:.2%}, "
+          f"AUC {manifest['test_metrics']['roc_auc']:.3f}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+Streamlit pages. app.py imports a page module only when it is first
+visited, so static pages never pay for pandas/matplotlib/sklearn or the
+model load. The Metrics page is only listed when CARDIOCARE_ADMIN=1.
+"""
+
+import os
+
+# Navigation label -> page module
+PAGES = {
+    "🏠 Home": "cardiocare.views.home",
+    "🔍 Predict Risk": "cardiocare.views.predict",
+    "📊 Health Dashboard": "cardiocare.views.dashboard",
+    "🗂️ History": "cardiocare.views.history",
+    "💡 Prevention Tips": "cardiocare.views.tips",
+    "📚 About Parameters": "cardiocare.views.parameters",
+    "📈 Model Analysis": "cardiocare.views.analysis",
+    "ℹ️ About Project": "cardiocare.views.about",
+}
+
+if os.environ.get("CARDIOCARE_ADMIN") == "1":
+    PAGES["⏱️ Metrics"] = "cardiocare.views.metrics"
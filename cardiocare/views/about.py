@@ -0,0 +1,150 @@
+"""About Project."""
+
+import streamlit as st
+
+from cardiocare.views.resources import load_evaluation, load_model_version
+
+
+def warm():
+    """Fetch the held-out metrics shown in the Model Performance card"""
+    load_evaluation(load_model_version())
+
+
+def render():
+    
+    st.markdown("""
+<div class="card">
+    <h3>🎯 Project Overview</h3>
+    <p>CardioCare is a machine learning-based application designed to assess 
+    cardiovascular disease risk using clinical and lifestyle parameters. 
+    The system provides personalized risk assessments and prevention recommendations.</p>
+</div>
+""", unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+<div class="card">
+<h3>🤖 Technology Stack</h3>
+<ul>
+<li><b>Frontend:</b> Streamlit</li>
+<li><b>ML Framework:</b> Scikit-learn</li>
+<li><b>Model:</b> Random Forest Classifier</li>
+<li><b>Visualization:</b> Matplotlib</li>
+<li><b>Data Processing:</b> Pandas, NumPy</li>
+</ul>
+</div>
+""", unsafe_allow_html=True)
+    
+    with col2:
+        # Held-out metrics from the evaluation build; notebook figures otherwise
+        evaluation = load_evaluation(load_model_version())
+        metrics = evaluation['metrics'] if evaluation else {
+            'accuracy': 0.7353, 'precision': 0.7626, 'recall': 0.6809, 'f1': 0.7194, 'roc_auc': 0.80
+        }
+        st.markdown(f"""
+<div class="card">
+<h3>📊 Model Performance</h3>
+<ul>
+<li><b>Accuracy:</b> {metrics['accuracy']:.2%}</li>
+<li><b>Precision:</b>  {metrics['precision']:.2%}</li>
+<li><b>Recall:</b> {metrics['recall']:.2%}</li>
+<li><b>F1-Score:</b> {metrics['f1']:.2%}</li>
+<li><b>AUC-ROC:</b> {metrics['roc_auc']:.2f}</li>
+</ul>
+</div>
+""", unsafe_allow_html=True)
+    
+    # Data for the table
+    comparison_data = {
+        "Algorithm": [
+            "Random Forest", 
+            "Logistic Regression", 
+            "Naive Bayes", 
+            "SVM", 
+            "Decision Tree"
+        ],
+        "Train Test Split": ["73.51%", "72.85%", "71.07%", "73.36%", "62.96%"],
+        "K-Fold": ["70.24%", "72.94%", "71.22%", "73.47%", "63.99%"],
+        "Hyperparameter Tuning": ["73.53%", "72.83%", "71.07%", "72.6%", "72.8%"]
+    }
+    
+    # Plain HTML rows: a static table isn't worth importing pandas for
+    header = "".join(f"<th>{column}</th>" for column in comparison_data)
+    rows = "".join("<tr>" + "".join(f"<td>{value}</td>" for value in row) + "</tr>"
+                   for row in zip(*comparison_data.values()))
+    table_html = f'<table class="custom-table"><thead><tr>{header}</tr></thead><tbody>{rows}</tbody></table>'
+    
+    # Styled Table HTML
+    # We use a dedicated variable with no indentation to avoid Markdown code block interpretation
+    html_code = f"""
+<style>
+.custom-table {{
+    width: 100%;
+    border-collapse: collapse;
+    margin-top: 20px;
+}}
+.custom-table th {{
+    background-color: #f1f5f9;
+    color: #475569;
+    font-weight: 600;
+    padding: 12px;
+    text-align: left;
+    border-bottom: 2px solid #e2e8f0;
+}}
+.custom-table td {{
+    padding: 12px;
+    border-bottom: 1px solid #e2e8f0;
+    color: #334155;
+    background-color: white; /* Ensure cells have white background */
+}}
+.custom-table tr:hover {{
+    background-color: #f8fafc;
+}}
+</style>
+
+<div class="card">
+    <h3>🧪 Algorithm Comparison</h3>
+    <p>Accuracy scores across different evaluation methods.</p>
+    <div style="overflow-x: auto; background-color: white; border-radius: 8px;">
+        {table_html}
+    </div>
+</div>
+"""
+    
+    st.markdown(html_code, unsafe_allow_html=True)
+    
+    st.markdown("""
+<div class="card">
+<h3>📁 Dataset Information</h3>
+<p>The model was trained on cardiovascular health data containing 70,000 records with 12 clinical features. The dataset includes balanced representation of various age groups and health conditions.</p>
+<h4>Features Used:</h4>
+<ul>
+<li><b>Demographic:</b> Age, Gender, Height, Weight</li>
+<li><b>Clinical:</b> Systolic BP, Diastolic BP, Cholesterol, Glucose</li>
+<li><b>Lifestyle:</b> Smoking, Alcohol, Physical Activity</li>
+</ul>
+</div>
+""", unsafe_allow_html=True)
+    
+    st.markdown("""
+<div class="card">
+<h3>⚠️ Important Disclaimer</h3>
+<p>This application is for <b>educational and informational purposes only</b> 
+and is not a substitute for professional medical advice, diagnosis, or treatment.</p>
+<p><b>Always seek the advice of your physician or qualified health provider</b> 
+with any questions you may have regarding a medical condition.</p>
+<p>The predictions are based on statistical models and may not be 100% accurate 
+for all individuals. Use this tool as a preliminary assessment only.</p>
+</div>
+""", unsafe_allow_html=True)
+    
+    # Footer
+    st.markdown("---")
+    st.markdown("""
+<div style='text-align: center;'>
+<p>Made with ❤️ using Machine Learning & Streamlit</p>
+<p><small>© 2024 CardioCare - Cardiovascular Health Assistant</small></p>
+</div>
+""", unsafe_allow_html=True)
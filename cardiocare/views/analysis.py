@@ -0,0 +1,126 @@
+"""Model Analysis."""
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+import streamlit as st
+
+from cardiocare.views.resources import load_evaluation, load_model_version, show_figure
+
+
+def warm():
+    """Fetch the stored evaluation ahead of the first visit"""
+    load_evaluation(load_model_version())
+
+
+def render():
+    
+    # Precomputed by `python -m cardiocare.evaluation` on the held-out test split
+    evaluation = load_evaluation(load_model_version())
+    
+    if evaluation is not None:
+        # Charts only change when the evaluation is rebuilt
+        evaluation_version = (evaluation['model_version'], evaluation['created'])
+        tabs = st.tabs(["🔥 Correlation Matrix", "😵 Confusion Matrix", "📉 ROC Curve", "✨ Feature Importance"])
+        
+        with tabs[0]:
+            st.markdown("<div class='card'><h3>Feature Correlations</h3>", unsafe_allow_html=True)
+            st.write("Understanding how different health factors relate to each other.")
+            
+            corr = pd.DataFrame(evaluation['correlation']['values'],
+                                index=evaluation['correlation']['columns'],
+                                columns=evaluation['correlation']['columns'])
+            
+            # Plot
+            # Reduced figure size for smaller display
+            def correlation_chart(figsize):
+                fig_corr, ax_corr = plt.subplots(figsize=figsize)
+                sns.heatmap(corr, annot=True, fmt=".2f", cmap="coolwarm", ax=ax_corr, annot_kws={"size": 5})
+                ax_corr.tick_params(axis='both', which='major', labelsize=5)
+                # Adjust colorbar font size
+                cbar = ax_corr.collections[0].colorbar
+                cbar.ax.tick_params(labelsize=5)
+                return fig_corr
+            show_figure(correlation_chart, (5, 4), evaluation_version)
+            st.markdown("</div>", unsafe_allow_html=True)
+        
+        with tabs[1]:
+            st.markdown("<div class='card'><h3>Model Confusion Matrix</h3>", unsafe_allow_html=True)
+            st.write("Evaluating model performance on the held-out test split.")
+            
+            cm = np.array(evaluation['confusion_matrix'])
+            
+            # Plot Heatmap
+            # Reduced figure size as requested to be very small
+            def confusion_chart(figsize):
+                fig_cm, ax_cm = plt.subplots(figsize=figsize)
+                sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=ax_cm,
+                            xticklabels=['Predicted Healthy', 'Predicted Disease'],
+                            yticklabels=['Actual Healthy', 'Actual Disease'],
+                            annot_kws={"size": 6})
+                ax_cm.set_title('Confusion Matrix', fontsize=7)
+                ax_cm.tick_params(axis='both', which='major', labelsize=5)
+                # Adjust colorbar font size
+                cbar = ax_cm.collections[0].colorbar
+                cbar.ax.tick_params(labelsize=5)
+                return fig_cm
+            show_figure(confusion_chart, (3, 2), evaluation_version)
+            
+            metrics = evaluation['metrics']
+            col_a, col_b, col_c, col_d = st.columns(4)
+            col_a.metric("Accuracy", f"{metrics['accuracy']:.1%}")
+            col_b.metric("Precision", f"{metrics['precision']:.1%}")
+            col_c.metric("Recall", f"{metrics['recall']:.1%}")
+            col_d.metric("F1-Score", f"{metrics['f1']:.1%}")
+            
+            quality = evaluation.get('quality')
+            excluded = (f", after excluding {quality['rejected']:,} implausible or repeated rows from the dataset"
+                        if quality else "")
+            calibration = evaluation.get('calibration')
+            if calibration:
+                rows = (f"{evaluation['n_test']:,} held-out test records not used to fit the calibration"
+                        f"{excluded}, at a {evaluation['threshold']:.0%} decision threshold on "
+                        f"{calibration['method']}-calibrated probabilities")
+            else:
+                rows = f"{evaluation['n_test']:,} held-out test records{excluded}"
+            st.caption(f"Metrics calculated on the {rows} (evaluation built {evaluation['created']}).")
+            st.markdown("</div>", unsafe_allow_html=True)
+        
+        with tabs[2]:
+            st.markdown("<div class='card'><h3>ROC Curve</h3>", unsafe_allow_html=True)
+            
+            roc = evaluation['roc_curve']
+            def roc_chart(figsize):
+                fig_roc, ax_roc = plt.subplots(figsize=figsize)
+                ax_roc.plot(roc['fpr'], roc['tpr'], color='#3498db',
+                            label=f"AUC = {evaluation['metrics']['roc_auc']:.2f}")
+                ax_roc.plot([0, 1], [0, 1], linestyle="--", color='#95a5a6')
+                ax_roc.set_xlabel("False Positive Rate", fontsize=7)
+                ax_roc.set_ylabel("True Positive Rate", fontsize=7)
+                ax_roc.tick_params(axis='both', which='major', labelsize=6)
+                ax_roc.legend(fontsize=7)
+                return fig_roc
+            show_figure(roc_chart, (4, 3), evaluation_version)
+            st.markdown("</div>", unsafe_allow_html=True)
+            
+        with tabs[3]:
+            st.markdown("<div class='card'><h3>Feature Importance</h3>", unsafe_allow_html=True)
+            
+            if 'feature_importances' in evaluation:
+                importances = pd.Series(evaluation['feature_importances']).sort_values(ascending=False)
+                
+                def importance_chart(figsize):
+                    fig_feat, ax_feat = plt.subplots(figsize=figsize)
+                    sns.barplot(x=importances.values, y=list(importances.index), palette='magma', ax=ax_feat)
+                    ax_feat.set_title("Random Forest Feature Importance")
+                    return fig_feat
+                show_figure(importance_chart, (8, 4), evaluation_version)
+            else:
+                st.warning("Model does not support feature importance visualization.")
+            
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    else:
+        st.error("Model evaluation has not been built for the current model. "
+                 "Run `python -m cardiocare.evaluation` to generate models/evaluation.json.")
@@ -0,0 +1,113 @@
+"""Health Dashboard (simplified without Plotly)."""
+
+import matplotlib.pyplot as plt
+import numpy as np
+import streamlit as st
+
+from cardiocare.health import RISK_BANDS, RISK_FACTORS
+from cardiocare.views.resources import (load_dataset_aggregates, load_evaluation, load_history,
+                                        load_model_version, show_figure)
+
+
+def render():
+    
+    st.markdown("### 📈 Risk Factor Distribution")
+    
+    # Running counts: the training dataset, and every patient screened so far
+    dataset = load_dataset_aggregates()
+    screened = load_history().aggregates()
+    risk_factors = RISK_FACTORS
+    prevalence = [round(p, 1) for p in dataset.prevalence()]
+    screened_prevalence = [round(p, 1) for p in screened.prevalence()] if screened.total else None
+    
+    # Create bar chart with matplotlib
+    def risk_factor_chart(figsize):
+        fig, ax = plt.subplots(figsize=figsize)
+        if screened_prevalence is None:
+            bars = ax.barh(risk_factors, prevalence, color=['#ff6b6b', '#ffa726', '#66bb6a', '#42a5f5', '#ab47bc', '#26c6da'])
+            ax.bar_label(bars, fmt='%.0f%%')
+        else:
+            y = np.arange(len(risk_factors))
+            bars = ax.barh(y + 0.2, prevalence, 0.4, color='#42a5f5', label=f'Dataset ({dataset.total:,})')
+            screened_bars = ax.barh(y - 0.2, screened_prevalence, 0.4, color='#ff6b6b',
+                                    label=f'Screened ({screened.total:,})')
+            ax.set_yticks(y, risk_factors)
+            ax.bar_label(bars, fmt='%.0f%%')
+            ax.bar_label(screened_bars, fmt='%.0f%%')
+            ax.legend(loc='lower right')
+        ax.set_xlabel('Prevalence (%)')
+        ax.set_title('Common Cardiovascular Risk Factors')
+        return fig
+    show_figure(risk_factor_chart, (8, 4), risk_factors, prevalence, screened_prevalence,
+                dataset.total, screened.total)
+    
+    st.markdown("### 📊 Health Metrics Ranges")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown("""
+<div class="card">
+    <h4>📉 Blood Pressure</h4>
+    <p><b>Normal:</b> <120/80 mmHg</p>
+    <p><b>Elevated:</b> 120-129/<80 mmHg</p>
+    <p><b>High Stage 1:</b> 130-139/80-89 mmHg</p>
+    <p><b>High Stage 2:</b> ≥140/≥90 mmHg</p>
+</div>
+""", unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+<div class="card">
+    <h4>📊 BMI Categories</h4>
+    <p><b>Underweight:</b> <18.5</p>
+    <p><b>Normal:</b> 18.5 - 24.9</p>
+    <p><b>Overweight:</b> 25 - 29.9</p>
+    <p><b>Obese:</b> ≥30</p>
+</div>
+""", unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown("""
+<div class="card">
+    <h4>📈 Cholesterol Levels</h4>
+    <p><b>Normal:</b> <200 mg/dL</p>
+    <p><b>Borderline:</b> 200-239 mg/dL</p>
+    <p><b>High:</b> ≥240 mg/dL</p>
+    <p><b>Ideal LDL:</b> <100 mg/dL</p>
+</div>
+""", unsafe_allow_html=True)
+    
+    # Create a simple pie chart for risk distribution
+    st.markdown("### 🎯 Risk Distribution in Population")
+    
+    labels = [f'{band} Risk' for band in RISK_BANDS]
+    colors = ['#4CAF50', '#FFC107', '#F44336']
+    
+    # Screened patients once there are any, otherwise the model's test split
+    if screened.total:
+        sizes = screened.band_counts()
+        population = f"the {screened.total:,} patients screened so far"
+    else:
+        evaluation = load_evaluation(load_model_version())
+        if not evaluation or 'risk_bands' not in evaluation:
+            st.info("No risk distribution yet. Make a prediction, or build it with "
+                    "`python -m cardiocare.evaluation`.")
+            return
+        sizes = [evaluation['risk_bands'][band] for band in RISK_BANDS]
+        population = f"the model's {evaluation['n_test']:,} held-out test patients"
+    shares = [size / sum(sizes) for size in sizes]
+    
+    col_pie1, col_pie2 = st.columns([1, 2])
+    with col_pie1:
+        def risk_pie_chart(figsize):
+            fig2, ax2 = plt.subplots(figsize=figsize)
+            ax2.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
+            ax2.axis('equal')
+            ax2.set_title('Cardio Risk')
+            return fig2
+        show_figure(risk_pie_chart, (5, 5), labels, sizes)
+    with col_pie2:
+        st.write(f"Among {population}, {shares[0]:.0%} have a low risk profile, while "
+                 f"{shares[1]:.0%} fall into the medium and {shares[2]:.0%} into the high-risk category, "
+                 "emphasizing the need for regular screenings.")
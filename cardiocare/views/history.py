@@ -0,0 +1,54 @@
+"""Prediction History (audit log of every prediction)."""
+
+import math
+
+import pandas as pd
+import streamlit as st
+
+from cardiocare.health import RISK_BANDS
+from cardiocare.history import PAGE_SIZE
+from cardiocare.views.resources import load_history
+
+
+def render():
+    st.markdown("### 🗂️ Prediction History")
+    st.write("Every prediction made in the app or through the scoring service, newest first")
+
+    store = load_history()
+    # Show predictions made a moment ago, still queued for the writer
+    store.flush()
+
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        band = st.selectbox("Risk band", ["All"] + RISK_BANDS, key="history_band")
+    with col2:
+        patient_id = st.text_input("Patient ID", key="history_patient").strip()
+    with col3:
+        page = st.number_input("Page", min_value=1, value=1, step=1, key="history_page")
+
+    rows, total = store.query(page=page - 1, risk_band=None if band == "All" else band,
+                              patient_id=patient_id or None)
+    n_pages = max(1, math.ceil(total / PAGE_SIZE))
+
+    if not total:
+        st.info("No predictions recorded yet." if band == "All" and not patient_id
+                else "No predictions match these filters.")
+        return
+    if not rows:
+        st.warning(f"There are only {n_pages} pages.")
+        return
+
+    table = pd.DataFrame({
+        'Time': pd.to_datetime([row['created'] for row in rows], unit='s', utc=True).tz_convert(None),
+        'Patient ID': [row['patient_id'] or '-' for row in rows],
+        'Risk': [f"{row['probability']:.1%}" for row in rows],
+        'Band': [row['risk_band'] for row in rows],
+        'Age': [row['inputs']['age_years'] for row in rows],
+        'Gender': [row['inputs']['gender'] for row in rows],
+        'BP': [f"{row['inputs']['ap_hi']}/{row['inputs']['ap_lo']}" for row in rows],
+        'Source': [row['source'] for row in rows],
+        'Model': [row['model_version'] or '-' for row in rows],
+        'Latency (ms)': [row['latency_ms'] for row in rows],
+    })
+    st.dataframe(table, use_container_width=True, hide_index=True)
+    st.caption(f"Page {page} of {n_pages} · {total:,} predictions (times in UTC)")
@@ -0,0 +1,33 @@
+"""Stage latency histograms of this app process (admin only)."""
+
+import pandas as pd
+import streamlit as st
+
+from cardiocare.metrics import ENABLED, REGISTRY
+
+
+def render():
+    st.markdown("### ⏱️ Metrics")
+    st.write("Time spent in each instrumented stage since this app process started")
+
+    if not ENABLED:
+        st.info("Timing spans are turned off (CARDIOCARE_METRICS=0).")
+        return
+
+    summary = REGISTRY.summary()
+    if not summary:
+        st.info("Nothing measured yet. Make a prediction or open a page first.")
+        return
+
+    table = pd.DataFrame([{'Span': name, 'Count': row['count'], 'Mean (ms)': row['mean_ms'],
+                           'p50 (ms)': row['p50_ms'], 'p95 (ms)': row['p95_ms'], 'p99 (ms)': row['p99_ms'],
+                           'Total (ms)': row['total_ms']} for name, row in summary.items()])
+    st.dataframe(table.style.format(precision=2), use_container_width=True, hide_index=True)
+    st.caption("Percentiles are interpolated within histogram buckets, like Prometheus' histogram_quantile")
+
+    with st.expander("Prometheus text format"):
+        st.code(REGISTRY.prometheus(), language="text")
+
+    if st.button("Reset histograms"):
+        REGISTRY.clear()
+        st.rerun()
@@ -0,0 +1,115 @@
+"""About Parameters."""
+
+import streamlit as st
+
+
+def render():
+    
+    parameters = {
+        "Age": {
+            "description": "Risk increases with age as arteries become less flexible.",
+            "normal_range": "N/A - Natural progression",
+            "impact": "High - Uncontrollable but manageable",
+            "tips": "Regular checkups become more important after 40"
+        },
+        "Blood Pressure": {
+            "description": "Force of blood against artery walls. High BP damages arteries.",
+            "normal_range": "<120/80 mmHg",
+            "impact": "Very High - Major controllable factor",
+            "tips": "Monitor regularly, reduce salt, manage stress"
+        },
+        "Cholesterol": {
+            "description": "Waxy substance in blood. High levels form plaque in arteries.",
+            "normal_range": "<200 mg/dL total cholesterol",
+            "impact": "High - Builds up silently",
+            "tips": "Limit saturated fats, eat soluble fiber, exercise"
+        },
+        "BMI (Body Mass Index)": {
+            "description": "Measures body fat based on height and weight.",
+            "normal_range": "18.5 - 24.9",
+            "impact": "Medium - Indirect risk factor",
+            "tips": "Combination of diet and exercise for healthy weight"
+        },
+        "Smoking": {
+            "description": "Chemicals damage blood vessels and heart.",
+            "normal_range": "Non-smoker",
+            "impact": "Very High - #1 preventable cause",
+            "tips": "Quit completely - benefits start immediately"
+        },
+        "Physical Activity": {
+            "description": "Exercise strengthens heart and improves circulation.",
+            "normal_range": "150 mins/week moderate exercise",
+            "impact": "High - Protective factor",
+            "tips": "Find activities you enjoy, consistency over intensity"
+        },
+        "Glucose Levels": {
+            "description": "High blood sugar damages blood vessels over time.",
+            "normal_range": "<100 mg/dL (fasting)",
+            "impact": "High - Silent damage",
+            "tips": "Limit refined carbs, maintain healthy weight"
+        },
+        "Alcohol": {
+            "description": "Excessive drinking raises BP and adds calories.",
+            "normal_range": "≤1 drink/day (women), ≤2 drinks/day (men)",
+            "impact": "Medium - Dose-dependent",
+            "tips": "Drink in moderation, have alcohol-free days"
+        }
+    }
+    
+    # Custom CSS for Parameter Cards
+    st.markdown("""
+    <style>
+    .param-card {
+        padding: 20px;
+        border-radius: 12px;
+        margin-bottom: 20px;
+        border-left: 5px solid #ccc;
+        background: white;
+        transition: transform 0.2s;
+        box-shadow: 0 2px 5px rgba(0,0,0,0.05);
+    }
+    .param-card:hover {
+        transform: translateX(5px);
+        box-shadow: 0 5px 15px rgba(0,0,0,0.1);
+    }
+    .param-title {
+        font-size: 1.2rem;
+        font-weight: 700;
+        margin-bottom: 10px;
+        color: #2c3e50;
+    }
+    .param-label {
+        font-weight: 600;
+        color: #555;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    # Define simple color scheme for borders
+    colors = {
+        "Age": "#3498db",          # Blue
+        "Blood Pressure": "#e74c3c", # Red
+        "Cholesterol": "#f1c40f",    # Yellow
+        "BMI (Body Mass Index)": "#9b59b6", # Purple
+        "Smoking": "#34495e",       # Dark
+        "Physical Activity": "#2ecc71", # Green
+        "Glucose Levels": "#e67e22", # Orange
+        "Alcohol": "#d35400"        # Burnt Orange
+    }
+
+    for param, info in parameters.items():
+        color = colors.get(param, "#95a5a6")
+        
+        st.markdown(f"""
+        <div class="param-card" style="border-left-color: {color};">
+            <div class="param-title" style="color: {color};">📌 {param}</div>
+            <p>{info['description']}</p>
+            <div style="display: flex; flex-wrap: wrap; gap: 20px; margin-top: 10px;">
+                <div><span class="param-label">Normal Range:</span> {info['normal_range']}</div>
+                <div><span class="param-label">Impact:</span> {info['impact']}</div>
+            </div>
+            <div style="margin-top: 10px; background: rgba(0,0,0,0.02); padding: 10px; border-radius: 8px;">
+                <span class="param-label">💡 Tip:</span> <i>{info['tips']}</i>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
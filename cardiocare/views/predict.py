@@ -0,0 +1,382 @@
+"""Predict Risk (main prediction page)."""
+
+import io
+import time
+
+import pandas as pd
+import streamlit as st
+
+from cardiocare.batch import score_file
+from cardiocare.encoder import INPUT_FIELDS
+from cardiocare.health import summarize
+from cardiocare.history import make_entry
+from cardiocare.metrics import observe
+from cardiocare.quality import QualityFilter
+from cardiocare.views.resources import load_history, load_scorer, show_figure
+from cardiocare.whatif import what_if
+
+# Display names of the model inputs
+FIELD_LABELS = {
+    'age_years': 'Age', 'gender': 'Gender', 'height': 'Height', 'weight': 'Weight',
+    'ap_hi': 'Systolic BP', 'ap_lo': 'Diastolic BP', 'cholesterol': 'Cholesterol',
+    'gluc': 'Glucose', 'smoke': 'Smoking', 'alco': 'Alcohol', 'active': 'Physical Activity'
+}
+
+
+def warm():
+    """Load the scorer ahead of the first visit"""
+    load_scorer()
+
+
+def render():
+    scorer = load_scorer()
+    encoder = scorer.encoder
+    
+    # Initialize session state for this page
+    if 'prediction_state' not in st.session_state:
+        st.session_state['prediction_state'] = 'input'
+    
+    # INPUT STATE
+    if st.session_state['prediction_state'] == 'input':
+        single_tab, bulk_tab = st.tabs(["👤 Single Patient", "📂 Bulk Upload"])
+        
+        with single_tab:
+            st.write("Enter your health parameters for AI-powered analysis")
+            
+            # Create form in columns
+            with st.form("heart_form"):
+                st.markdown("<div class='card'><h3>👤 Personal Information</h3></div>", unsafe_allow_html=True)
+                
+                patient_id = st.text_input("Patient ID (optional)", max_chars=64,
+                                           help="Links this prediction to the patient in the History page")
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    age_years = st.number_input("Age (years)", 18, 100, 45, help="Your current age")
+                    height = st.number_input("Height (cm)", 120, 220, 165)
+                    weight = st.number_input("Weight (kg)", 30, 200, 70)
+                
+                with col2:
+                    gender = st.selectbox("Gender", ["Male", "Female"])
+                    smoke = st.selectbox("Do you smoke?", ["no", "yes"], help="Regular tobacco smoking")
+                    alco = st.selectbox("Alcohol consumption", ["no", "yes"], help="Regular alcohol intake")
+                    active = st.selectbox("Physical activity", ["no", "yes"], help="Regular exercise or active lifestyle")
+                
+                st.markdown("<div class='card'><h3>🩺 Medical Information</h3></div>", unsafe_allow_html=True)
+                
+                col3, col4 = st.columns(2)
+                
+                with col3:
+                    ap_hi = st.number_input("Systolic BP (mmHg)", 80, 250, 120, help="Higher number in blood pressure reading")
+                    cholesterol = st.selectbox("Cholesterol Level", 
+                                              ["normal", "above_normal", "well_above"],
+                                              help="Your cholesterol level")
+                
+                with col4:
+                    ap_lo = st.number_input("Diastolic BP (mmHg)", 40, 150, 80, help="Lower number in blood pressure reading")
+                    gluc = st.selectbox("Glucose Level",
+                                       ["normal", "above_normal", "well_above"],
+                                       help="Your blood glucose level")
+                
+                # Calculate real-time metrics for display (optional, can be removed if confusing in form)
+                # Keeping it simple for the form view
+                
+                submit = st.form_submit_button("🚀 Predict My Risk", use_container_width=True)
+            
+            if submit:
+                with st.spinner("Analyzing your health data with AI..."):
+                    record = {
+                        'age_years': age_years,
+                        'gender': gender,
+                        'height': height,
+                        'weight': weight,
+                        'ap_hi': ap_hi,
+                        'ap_lo': ap_lo,
+                        'smoke': smoke,
+                        'alco': alco,
+                        'active': active,
+                        'cholesterol': cholesterol,
+                        'gluc': gluc
+                    }
+                    
+                    start = time.perf_counter()
+                    
+                    # Encode inputs (scaling + categorical mappings) in one pass
+                    X_input = encoder.encode_records([record])
+                    
+                    # Prediction
+                    probability = scorer.score(X_input)[0]
+                    latency_ms = (time.perf_counter() - start) * 1e3
+                    
+                    # Save to session state, with BMI/BP categories and risk factor counts
+                    result = {**record, **summarize(record, probability, scorer.decision_threshold)}
+                    
+                    # Per-factor contributions along the forest's decision paths
+                    explanation = scorer.explain(X_input)
+                    if explanation is not None:
+                        result['baseline'] = explanation[0]
+                        result['contributions'] = explanation[1][0]
+                    result['patient_id'] = patient_id.strip()
+                    st.session_state['last_prediction'] = result
+                    
+                    # Audit log; written by a background thread
+                    load_history().log(make_entry(record, result, scorer.version, latency_ms,
+                                                  patient_id=result['patient_id'], source="app"))
+                    
+                    # Change state and rerun
+                    st.session_state['prediction_state'] = 'result'
+                    st.rerun()
+        
+        with bulk_tab:
+            st.write("Score a whole file of patients in one go")
+            st.markdown("""<div class='card'><h3>📂 Bulk Scoring</h3>
+<p>Upload a file in the <b>cardio_train.csv</b> layout (<code>;</code>-separated, age in days, gender 1/2)
+or the <b>cardio_preprocessed.csv</b> layout. Rows are scored in chunks, so large files are fine.
+Rows with implausible measurements are set aside with the reason.</p></div>""",
+                        unsafe_allow_html=True)
+            
+            uploaded = st.file_uploader("Patient file", type=["csv", "parquet"])
+            if uploaded is not None and st.button("🚀 Score File", use_container_width=True):
+                output, rejected = io.BytesIO(), io.BytesIO()
+                quality = QualityFilter(drop_duplicates=False)
+                status = st.empty()
+                try:
+                    with st.spinner("Scoring patients..."):
+                        rows = score_file(scorer, uploaded, output,
+                                          source_name=uploaded.name, destination_name="scores.csv",
+                                          progress=lambda n: status.write(f"{n:,} rows scored"),
+                                          quality=quality, rejected=rejected)
+                    st.session_state['bulk_scores'] = {'name': uploaded.name, 'rows': rows, 'csv': output.getvalue(),
+                                                       'rejected': quality.rejected,
+                                                       'rejected_csv': rejected.getvalue()}
+                except Exception as e:
+                    st.error(f"Error scoring file: {str(e)}")
+                    st.warning("Please check column names and data format.")
+            
+            bulk = st.session_state.get('bulk_scores')
+            if bulk:
+                st.success(f"Scored {bulk['rows']:,} patients from {bulk['name']}")
+                st.dataframe(pd.read_csv(io.BytesIO(bulk['csv']), nrows=20), use_container_width=True, hide_index=True)
+                st.download_button(
+                    label="📥 Download Scores (CSV)",
+                    data=bulk['csv'],
+                    file_name="cardio_scores.csv",
+                    mime="text/csv",
+                    use_container_width=True
+                )
+                if bulk['rejected']:
+                    st.warning(f"{bulk['rejected']:,} rows were not scored because of implausible measurements")
+                    st.download_button(
+                        label="📥 Download Rejected Rows (CSV)",
+                        data=bulk['rejected_csv'],
+                        file_name="cardio_rejected.csv",
+                        mime="text/csv",
+                        use_container_width=True
+                    )
+
+    # RESULT STATE
+    elif st.session_state['prediction_state'] == 'result':
+        render_start = time.perf_counter()
+        # Retrieve data
+        data = st.session_state.get('last_prediction', {})
+        
+        # Auto-scroll to top
+        st.markdown("""
+            <script>
+                var element = window.parent.document.querySelector('.main .block-container');
+                if (element) {
+                    element.scrollTop = 0;
+                }
+            </script>
+        """, unsafe_allow_html=True)
+        
+        st.markdown("### Here is your personalized AI health assessment")
+        
+        if data:
+            prediction = data['prediction']
+            probability = data['probability']
+            
+            if prediction == 1:
+                st.markdown(
+                    f"""<div class='result-high'>
+                    ⚠️ <b>HIGH RISK DETECTED</b><br>
+                    Risk Probability: <b>{probability:.1%}</b><br>
+                    <small>Please consult a healthcare professional</small>
+                    </div>""",
+                    unsafe_allow_html=True
+                )
+                
+                st.markdown("""
+<div class="warning-box">
+    <h4>⚠️ Immediate Recommendations:</h4>
+    <ul>
+        <li>Consult a cardiologist or healthcare provider</li>
+        <li>Schedule a comprehensive health checkup</li>
+        <li>Monitor your blood pressure daily</li>
+        <li>Consider lifestyle modifications</li>
+        <li>Avoid smoking and limit alcohol</li>
+    </ul>
+</div>
+""", unsafe_allow_html=True)
+            else:
+                st.markdown(
+                    f"""<div class='result-low'>
+                    ✅ <b>LOW RISK</b><br>
+                    Risk Probability: <b>{probability:.1%}</b><br>
+                    <small>Continue maintaining healthy habits!</small>
+                    </div>""",
+                    unsafe_allow_html=True
+                )
+                
+                st.markdown("""
+<div class="info-box">
+    <h4>🎉 Great Going!</h4>
+    <p>Your current health parameters indicate low cardiovascular risk. 
+    Keep up the good work with regular exercise, balanced diet, and annual checkups.</p>
+</div>
+""", unsafe_allow_html=True)
+            
+            # Risk factors breakdown
+            st.markdown("### 🔍 Risk Factors Analysis")
+            col8, col9, col10 = st.columns(3)
+            
+            with col8:
+                st.metric("Lifestyle Risk", data['lifestyle_risk'], "/3 factors")
+            
+            with col9:
+                st.metric("Medical Risk", data['medical_risk'], "/3 factors")
+            
+            with col10:
+                st.metric("Total Risk Factors", data['total_risk'], "/6 possible")
+            
+            # What drives this patient's prediction
+            contributions = data.get('contributions')
+            if contributions:
+                st.markdown("### 🧬 What Drives Your Prediction")
+                st.caption(f"Average risk in the training data is {data['baseline']:.1%}. "
+                           "Each bar shows how much one of your values moved your risk up or down.")
+                drivers = sorted(contributions.items(), key=lambda item: abs(item[1]))
+                labels = [FIELD_LABELS[field] for field, _ in drivers]
+                points = [100 * value for _, value in drivers]
+                
+                def contribution_chart(figsize):
+                    import matplotlib.pyplot as plt
+                    fig, ax = plt.subplots(figsize=figsize)
+                    bars = ax.barh(labels, points, color=['#ff6b6b' if p > 0 else '#66bb6a' for p in points])
+                    ax.axvline(0, color='#888888', linewidth=0.8)
+                    ax.set_xlabel('Change in risk (percentage points)')
+                    ax.bar_label(bars, fmt='%+.1f')
+                    return fig
+                show_figure(contribution_chart, (8, 4), labels, points)
+            
+            # What-if explorer over the factors the patient can change
+            st.markdown("### 🔧 What If?")
+            st.caption("Adjust the factors you can influence to see how your risk would respond.")
+            col_w1, col_w2, col_w3 = st.columns(3)
+            with col_w1:
+                new_weight = st.slider("Weight (kg)", 30, 200, int(data['weight']), key="whatif_weight")
+                new_smoke = st.selectbox("Smoking", ["no", "yes"], index=["no", "yes"].index(data['smoke']),
+                                         key="whatif_smoke")
+            with col_w2:
+                new_ap_hi = st.slider("Systolic BP (mmHg)", 80, 250, int(data['ap_hi']), key="whatif_ap_hi")
+                new_active = st.selectbox("Physical Activity", ["no", "yes"],
+                                          index=["no", "yes"].index(data['active']), key="whatif_active")
+            with col_w3:
+                new_ap_lo = st.slider("Diastolic BP (mmHg)", 40, 150, int(data['ap_lo']), key="whatif_ap_lo")
+                new_cholesterol = st.select_slider("Cholesterol", ["normal", "above_normal", "well_above"],
+                                                   value=data['cholesterol'], key="whatif_cholesterol")
+            
+            changes = {'weight': new_weight, 'ap_hi': new_ap_hi, 'ap_lo': new_ap_lo,
+                       'smoke': new_smoke, 'active': new_active, 'cholesterol': new_cholesterol}
+            what_if_probability, curves = what_if(scorer, {field: data[field] for field in INPUT_FIELDS}, changes)
+            st.metric("Risk with these changes", f"{what_if_probability:.1%}",
+                      f"{100 * (what_if_probability - probability):+.1f} pts", delta_color="inverse")
+            
+            curve_points = tuple((factor, tuple(values), tuple(round(100 * float(p), 2) for p in probs))
+                                 for factor, (values, probs) in curves.items())
+            
+            def what_if_chart(figsize):
+                import matplotlib.pyplot as plt
+                fig, axes = plt.subplots(2, 3, figsize=figsize, sharey=True)
+                for ax, (factor, values, points) in zip(axes.ravel(), curve_points):
+                    if isinstance(values[0], str):
+                        ax.bar(values, points, color=['#ff6b6b' if v == changes[factor] else '#42a5f5' for v in values])
+                    else:
+                        ax.plot(values, points, color='#ff6b6b')
+                        ax.axvline(changes[factor], color='#888888', linestyle='--', linewidth=0.8)
+                    ax.set_title(FIELD_LABELS[factor])
+                    ax.set_ylim(0, 100)
+                for ax in axes[:, 0]:
+                    ax.set_ylabel('Risk (%)')
+                fig.tight_layout()
+                return fig
+            show_figure(what_if_chart, (10, 5), curve_points, tuple(changes.items()))
+            
+            # Metrics
+            st.markdown("### 📊 Your Metrics")
+            col_m1, col_m2, col_m3 = st.columns(3)
+            with col_m1:
+                st.metric("BMI", f"{data['bmi']:.1f}", data['bmi_category'])
+            with col_m2:
+                st.metric("Blood Pressure", f"{data['ap_hi']}/{data['ap_lo']}", data['bp_category'])
+            with col_m3:
+                st.metric("Age", data['age_years'], "Years")
+
+            # Report Generation
+            if contributions:
+                top = sorted(contributions.items(), key=lambda item: -item[1])[:3]
+                drivers_text = ", ".join(f"{FIELD_LABELS[field]} ({100 * value:+.1f} pts)"
+                                         for field, value in top if value > 0) or "None"
+            else:
+                drivers_text = "Not available"
+            report = f"""
+            HEART HEALTH REPORT
+            ===================
+            
+            Personal Information:
+            - Patient ID: {data.get('patient_id') or '-'}
+            - Age: {data['age_years']} years
+            - Gender: {data['gender']}
+            - Height: {data['height']} cm
+            - Weight: {data['weight']} kg
+            - BMI: {data['bmi']:.1f} ({data['bmi_category']})
+            
+            Lifestyle Factors:
+            - Smoking: {data['smoke']}
+            - Alcohol: {data['alco']}
+            - Physical Activity: {data['active']}
+            
+            Medical Parameters:
+            - Blood Pressure: {data['ap_hi']}/{data['ap_lo']} mmHg ({data['bp_category']})
+            - Cholesterol: {data['cholesterol']}
+            - Glucose: {data['gluc']}
+            
+            PREDICTION RESULTS:
+            - Risk Probability: {data['probability']:.1%}
+            - Risk Level: {'HIGH RISK' if prediction == 1 else 'LOW RISK'}
+            - Total Risk Factors: {data['total_risk']}/6
+            - Main Risk Drivers: {drivers_text}
+            
+            Recommendations:
+            {'Consult a healthcare professional immediately' if prediction == 1 
+             else 'Continue maintaining healthy lifestyle habits'}
+            
+            Report generated by CardioCare AI
+            """
+            # Recorded before the buttons, as "Check Another Patient" reruns mid-render
+            observe("predict.render", time.perf_counter() - render_start)
+            
+            col_btn1, col_btn2 = st.columns(2)
+            with col_btn1:
+                st.download_button(
+                    label="📥 Download Full Report",
+                    data=report,
+                    file_name="heart_health_report.txt",
+                    mime="text/plain",
+                    use_container_width=True
+                )
+            with col_btn2:
+                if st.button("⬅️ Check Another Patient", use_container_width=True):
+                    st.session_state['prediction_state'] = 'input'
+                    st.rerun()
@@ -0,0 +1,93 @@
+"""
+Cached resources shared by the pages. Heavy modules are imported inside
+each loader, so a page only pays for what it actually uses.
+"""
+
+import os
+
+import streamlit as st
+
+import cardiocare.models
+
+# "table" answers predictions from models/risk_table.npy (see cardiocare.table),
+# "compact" from models/compact_forest.npz (see cardiocare.compact)
+SCORER = os.environ.get("CARDIOCARE_SCORER", "forest")
+# Serves this process' span histograms on GET /metrics when set, on METRICS_HOST (see cardiocare.metrics)
+METRICS_PORT = os.environ.get("CARDIOCARE_METRICS_PORT")
+METRICS_HOST = os.environ.get("CARDIOCARE_METRICS_HOST", "127.0.0.1")
+
+
+@st.cache_resource
+def load_models():
+    return cardiocare.models.load_models()
+
+
+@st.cache_resource
+def start_metrics_exporter():
+    """Prometheus endpoint for the whole app process, started once"""
+    if not METRICS_PORT:
+        return None
+    from cardiocare.metrics import start_exporter
+    return start_exporter(int(METRICS_PORT), METRICS_HOST)
+
+
+@st.cache_resource
+def load_prediction_cache():
+    """Results of recently scored profiles, shared by all sessions"""
+    from cardiocare.cache import PredictionCache
+    return PredictionCache()
+
+
+@st.cache_resource
+def load_scorer():
+    """Encoder + flattened forest shared by all sessions"""
+    if SCORER == "table":
+        from cardiocare.table import RiskTable
+        return RiskTable.load()
+    if SCORER == "compact":
+        from cardiocare.compact import CompactForest
+        return CompactForest.load()
+    from cardiocare.calibration import load_calibration
+    from cardiocare.scoring import Scorer
+    return Scorer(*load_models(), cache=load_prediction_cache(), version=load_model_version(),
+                  calibration=load_calibration(expected_version=load_model_version()))
+
+
+@st.cache_resource
+def load_model_version():
+    return cardiocare.models.model_version()
+
+
+@st.cache_data
+def load_evaluation(version):
+    """Stored Model Analysis results for this model version (None if not built)"""
+    import cardiocare.evaluation
+    return cardiocare.evaluation.load_evaluation(expected_version=version)
+
+
+@st.cache_resource
+def load_history():
+    """Prediction audit log with its background writer, shared by all sessions"""
+    from cardiocare.history import HistoryStore
+    return HistoryStore()
+
+
+@st.cache_resource
+def load_dataset_aggregates():
+    """Risk factor counts over the training dataset, counted once"""
+    from cardiocare.aggregates import dataset_aggregates
+    return dataset_aggregates()
+
+
+@st.cache_resource
+def load_figure_cache():
+    """Rendered chart images shared by all sessions"""
+    from cardiocare.figures import FigureCache
+    return FigureCache()
+
+
+def show_figure(build, figsize, *data):
+    """Display ``build(figsize)``, rendered once per chart, size, data and theme"""
+    from cardiocare.figures import figure_key
+    key = figure_key(build.__name__, figsize, st.get_option("theme.base"), *data)
+    st.image(load_figure_cache().render(key, lambda: build(figsize)), use_container_width=True)
@@ -0,0 +1,103 @@
+"""Prevention Tips."""
+
+import streamlit as st
+
+
+def render():
+    
+    tabs = st.tabs(["🏃‍♂️ Lifestyle", "🍎 Diet", "📋 Monitoring", "🧘‍♀️ Stress Management"])
+    
+    with tabs[0]:
+        st.markdown("""
+<div class="card">
+<h3>🏃‍♂️ Physical Activity Recommendations</h3>
+<ul>
+<li><b>Aerobic Exercise:</b> 150 minutes per week of moderate-intensity exercise</li>
+<li><b>Strength Training:</b> 2 days per week focusing on major muscle groups</li>
+<li><b>Daily Movement:</b> Take breaks from sitting every hour</li>
+<li><b>Consistency:</b> Better to exercise regularly than intensely occasionally</li>
+</ul>
+</div>
+""", unsafe_allow_html=True)
+        
+        st.markdown("""
+<div class="card">
+<h3>🚭 Avoid Harmful Habits</h3>
+<ul>
+<li><b>Stop Smoking:</b> Reduces heart disease risk by 50% within 1 year</li>
+<li><b>Limit Alcohol:</b> Maximum 1 drink per day for women, 2 for men</li>
+<li><b>Avoid Sedentary Lifestyle:</b> Stand up and move every 30 minutes</li>
+<li><b>Manage Stress:</b> Practice mindfulness and relaxation techniques</li>
+</ul>
+</div>
+""", unsafe_allow_html=True)
+    
+    with tabs[1]:
+        st.markdown("""
+<div class="card">
+<h3>🍎 Heart-Healthy Diet</h3>
+<h4>✅ Foods to Include:</h4>
+<ul>
+<li><b>Fruits & Vegetables:</b> 5 servings per day minimum</li>
+<li><b>Whole Grains:</b> Oats, brown rice, quinoa, whole wheat</li>
+<li><b>Lean Protein:</b> Fish (especially salmon), skinless poultry, legumes</li>
+<li><b>Healthy Fats:</b> Avocados, nuts, olive oil</li>
+</ul>
+<h4>❌ Foods to Limit:</h4>
+<ul>
+<li><b>Processed Foods:</b> High in sodium and preservatives</li>
+<li><b>Trans Fats:</b> Found in fried foods and baked goods</li>
+<li><b>Added Sugars:</b> Limit to less than 25g per day</li>
+<li><b>Red Meat:</b> Choose lean cuts and limit consumption</li>
+</ul>
+</div>
+""", unsafe_allow_html=True)
+    
+    with tabs[2]:
+        st.markdown("""
+<div class="card">
+<h3>📋 Health Monitoring Schedule</h3>
+<h4>Daily Monitoring:</h4>
+<ul>
+<li><b>Blood Pressure:</b> If you have hypertension</li>
+<li><b>Physical Activity:</b> Aim for 10,000 steps</li>
+<li><b>Weight:</b> Weekly monitoring recommended</li>
+</ul>
+<h4>Regular Checkups:</h4>
+<ul>
+<li><b>Annual Physical:</b> Complete health assessment</li>
+<li><b>Cholesterol Test:</b> Every 4-6 years (more if high risk)</li>
+<li><b>Blood Glucose:</b> Annual screening after age 45</li>
+<li><b>ECG:</b> As recommended by your doctor</li>
+</ul>
+<h4>Warning Signs to Watch For:</h4>
+<ul>
+<li>Chest pain or discomfort</li>
+<li>Shortness of breath</li>
+<li>Irregular heartbeat</li>
+<li>Excessive fatigue</li>
+<li>Swelling in legs/ankles</li>
+</ul>
+</div>
+""", unsafe_allow_html=True)
+    
+    with tabs[3]:
+        st.markdown("""
+<div class="card">
+<h3>🧘‍♀️ Stress Management Techniques</h3>
+<h4>Immediate Relief:</h4>
+<ul>
+<li><b>Deep Breathing:</b> 4-7-8 technique (inhale 4, hold 7, exhale 8)</li>
+<li><b>Progressive Muscle Relaxation:</b> Tense and relax muscle groups</li>
+<li><b>Mindful Walking:</b> 5-minute walk focusing on surroundings</li>
+</ul>
+<h4>Long-term Strategies:</h4>
+<ul>
+<li><b>Regular Exercise:</b> Natural stress reliever</li>
+<li><b>Meditation:</b> 10 minutes daily using apps like Calm or Headspace</li>
+<li><b>Sleep Hygiene:</b> 7-9 hours of quality sleep</li>
+<li><b>Social Connections:</b> Maintain supportive relationships</li>
+<li><b>Hobbies:</b> Engage in activities you enjoy</li>
+</ul>
+</div>
+""", unsafe_allow_html=True)
@@ -0,0 +1,42 @@
+"""
+What-if sensitivity of a prediction to the factors a patient can change.
+
+The scenario row is encoded once; every curve point is a copy of it with a
+single column overwritten, and the scenario plus all curves are scored in
+one batch.
+"""
+
+import numpy as np
+
+# Modifiable factors and the values their curves are scored on (Predict Risk form bounds)
+FACTORS = {
+    'weight': list(range(30, 201)),
+    'ap_hi': list(range(80, 251)),
+    'ap_lo': list(range(40, 151)),
+    'cholesterol': ['normal', 'above_normal', 'well_above'],
+    'smoke': ['no', 'yes'],
+    'active': ['no', 'yes'],
+}
+
+
+def what_if(scorer, record, changes=None, factors=FACTORS):
+    """
+    Probability of ``record`` with ``changes`` applied, and around that
+    scenario a risk curve per factor: ``(probability, {factor: (values, probabilities)})``
+    """
+    encoder = scorer.encoder
+    row = encoder.encode_records([{**record, **(changes or {})}])
+
+    blocks = [row]
+    for factor, values in factors.items():
+        block = np.repeat(row, len(values), axis=0)
+        block[:, encoder.feature_columns.index(factor)] = encoder.encode_column(factor, values)
+        blocks.append(block)
+    probabilities = scorer.score(np.concatenate(blocks))
+
+    curves = {}
+    start = 1
+    for factor, values in factors.items():
+        curves[factor] = (values, probabilities[start:start + len(values)])
+        start += len(values)
+    return float(probabilities[0]), curves